@@ -1,41 +1,44 @@
-import os, io, base64
+import os, json, re, inspect
+import click
 from functools import wraps
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, session
-import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from sqlalchemy import create_engine, select, and_, text
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, send_file, session, abort, g
+from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy import create_engine, select, insert, and_, make_url
 from sqlalchemy.orm import Session
 from datetime import datetime, date, timezone
 from calendar import monthrange
 
-from models import Base, State, Log, Progress, WorkoutSession, PRHistory
-from logic import DAYS, COMPOUND_RM_MAP, round_to_2p5, compute_new_load
+import blocks
+import charts
+import config
+import export
+import metrics
+import reads
+import schema
+import state_cache
+import summaries
+import units
+from models import User, State, Log, Progress, WorkoutSession, PRHistory, WeekSync, EstimatedRM
+from logic import (DAYS, COMPOUND_RM_MAP, ESTIMATED_RM_MAP, PROGRAM_HASH, round_to_2p5,
+                   amrap_reps, compute_new_load, epley_1rm, best_estimated_rms)
 
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///local.db")
-engine = create_engine(
-    DATABASE_URL,
-    future=True,
-    pool_pre_ping=True,
-    pool_recycle=1800
-)
-
-def ensure_db():
+engine = create_engine(DATABASE_URL, **config.engine_options(DATABASE_URL))
+
+def ensure_db(force: bool = False):
     """
-    Ensure DB connection is alive and all tables exist.
-    Safe to call as often as needed; create_all is idempotent.
+    Ensure the schema is bootstrapped for this process.
+    Only the first call (or force=True, used by /healthz) touches the DB;
+    afterwards this is an in-process flag check.
     """
-    with engine.connect() as conn:
-        conn.execute(text("select 1"))
-    Base.metadata.create_all(engine)
+    return schema.bootstrap(engine, force=force)
 
 app = Flask(__name__)
 
 @app.route("/healthz")
 def healthz():
     try:
-        ensure_db()
+        ensure_db(force=True)
         return "ok", 200
     except Exception as e:
         return f"db error: {e}", 500
@@ -44,14 +47,18 @@ def healthz():
 def rm_test_health():
     ensure_db()
     with Session(engine) as s:
-        st = get_or_create_state(s)
+        st = current_state(s, schema.default_user_id())
         return {
             "ok": True,
             "units": st.units,
-            "rms": st.rms,
+            "rms": {k: getattr(st, k) for k in ["bench", "squat", "deadlift", "ohp"]},
         }, 200
 
 app.secret_key = os.environ.get("FLASK_SECRET", "dev-secret")
+metrics.init_app(app, engine)
+state_cache.track(Session)
+# INFO shows per-save row counts (see week_view)
+app.logger.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
 
 # --- helpers for week-1/2 suggested loads from RM Test ---
 def _percent_for_week(week: int) -> float:
@@ -93,35 +100,10 @@ def seed_from_rms_for_row(row, st, week: int, rm_map: dict):
     load_kg = _round_kg_to_2p5(one_rm * pct)
     row.load_last = load_kg                # stored as kg in the DB
 
-# ------------ 1RM estimation (Epley) and updater ------------
-def epley_1rm(weight_kg: float, reps: int) -> float:
-
-    #Epley: 1RM ≈ w * (1 + reps/30). Returns kg. Requires reps >= 1 and weight > 0.
-
-    if not weight_kg or weight_kg <= 0 or not reps or reps < 1:
-        return 0.0
-    return weight_kg * (1.0 + reps / 30.0)
-
-# Map exercises to which Settings 1RM they influence
-ESTIMATED_RM_MAP = {
-    # Squat
-    "Back Squat": "squat",
-
-    # Bench (barbell focus; include close-grip as a conservative bench estimator)
-    "Flat Barbell Bench Press": "bench",
-    "Close-Grip Bench Press": "bench",
-
-    # Overhead Press
-    "Overhead Press (Barbell/DB)": "ohp",
-    "Seated DB Overhead Press": "ohp",
-
-    # Deadlift
-    "Deadlift": "deadlift",
-}
-
+# ------------ 1RM updater ------------
 def update_1rms_from_rows(state_obj, log_rows):
 
-    #Scan this set of Log rows for best Epley estimates per lift type, compare to State.rms,
+    #Scan this set of Log rows for best Epley estimates per lift type, compare to the State 1RMs,
     #and update + return a list of (rm_key, old_kg, new_kg) when a PR is detected.
 
         # best estimated 1RM in kg per lift key
@@ -132,8 +114,7 @@ def update_1rms_from_rows(state_obj, log_rows):
         if not rm_key:
             continue
 
-        reps_candidates = [r.s1 or 0, r.s2 or 0, r.s3 or 0]
-        max_reps = max(reps_candidates) if reps_candidates else 0
+        max_reps = max((x or 0 for x in r.reps or []), default=0)
         if not max_reps or not r.load_last:
             continue
 
@@ -141,18 +122,13 @@ def update_1rms_from_rows(state_obj, log_rows):
         if est > best_est[rm_key]:
             best_est[rm_key] = est
 
-    # compare to stored rms in State.rms
-    rms = state_obj.rms or {}
+    # compare to the 1RMs stored on State (kg) and raise them on a PR
     pr_list = []
-
     for key in ["bench", "squat", "deadlift", "ohp"]:
-        current = rms.get(key) or 0.0
+        current = getattr(state_obj, key) or 0.0
         if best_est[key] > current:
             pr_list.append((key, current, best_est[key]))
-            rms[key] = best_est[key]
-
-    # write back updated dict
-    state_obj.rms = rms
+            setattr(state_obj, key, best_est[key])
     return pr_list
 
 LIFT_LABELS = {
@@ -162,59 +138,162 @@ LIFT_LABELS = {
     "ohp": "Overhead Press",
 }
 
-def build_1rm_progress(s: Session, st: State):
-    #Build an estimated 1RM history per week per lift using Epley
-    #based on your logged sets in Log.
-    #Returns a list of dicts: {week, lift, value}.
+def refresh_estimated_rms(s: Session, user_id: int, week: int, week_rows, lift_keys=None):
+    #Incrementally maintain EstimatedRM for one week from that week's Log rows.
+    #lift_keys limits the refresh to lifts whose rows changed (default: all).
+    best = best_estimated_rms(week_rows)
+    keys = set(lift_keys) if lift_keys is not None else set(ESTIMATED_RM_MAP.values())
+    if not keys:
+        return
 
-    # All rows for exercises that map to an RM key
-    rows = s.scalars(
-        select(Log).where(Log.exercise.in_(list(ESTIMATED_RM_MAP.keys())))
+    existing = {
+        e.lift_key: e
+        for e in s.scalars(select(EstimatedRM).where(
+            EstimatedRM.user_id == user_id, EstimatedRM.week == week,
+            EstimatedRM.lift_key.in_(keys)))
+    }
+    for key in keys:
+        est = best.get((key, week))
+        cur = existing.get(key)
+        if est is None:
+            if cur is not None:
+                s.delete(cur)
+        elif cur is None:
+            s.add(EstimatedRM(user_id=user_id, lift_key=key, week=week, est_kg=est))
+        elif cur.est_kg != est:
+            cur.est_kg = est
+
+def build_1rm_progress(s: Session, st: State, since_week: int = 1):
+    #Estimated 1RM history per week per lift from since_week on, read from the
+    #precomputed EstimatedRM table (maintained on week save, see refresh_estimated_rms).
+    #Returns a list of dicts: {week, lift, value}.
+    rows = s.execute(
+        select(EstimatedRM.lift_key, EstimatedRM.week, EstimatedRM.est_kg)
+        .where(EstimatedRM.user_id == st.user_id, EstimatedRM.week >= since_week)
+        .order_by(EstimatedRM.week, EstimatedRM.lift_key)
     ).all()
 
-    best = {}  # (rm_key, week) -> best estimated 1RM in kg
+    values = units.display_many([est_kg for _, _, est_kg in rows], st.units, 1)
+    return [
+        {"week": week, "lift": LIFT_LABELS.get(rm_key, rm_key.title()), "value": val}
+        for (rm_key, week, _), val in zip(rows, values)
+    ]
+
+# ------------ Week form parsing ------------
+_ROW_FIELD = re.compile(r"row_(\d+)_(\w+)$")
+MAX_SETS = 20  # highest set index a row accepts (programmed sets plus extras)
+
+def submitted_row_fields(form) -> dict:
+    # {log_id: {field: value}} for every row_<id>_<field> input in the form;
+    # the week modal only posts the inputs of the day being saved
+    out = {}
+    for name, value in form.items():
+        m = _ROW_FIELD.match(name)
+        if m:
+            out.setdefault(int(m.group(1)), {})[m.group(2)] = value
+    return out
 
-    for r in rows:
-        rm_key = ESTIMATED_RM_MAP.get(r.exercise)
-        if not rm_key:
+def apply_row_fields(r: Log, fields: dict, unit: str) -> bool:
+    # Apply one row's submitted load (display units) and per-set reps;
+    # returns True if anything stored on the row changed
+    changed = False
+    load_field = fields.get("load")
+    if load_field not in (None, ""):
+        try:
+            load_val = float(load_field)
+            load_kg = units.to_kg(load_val, unit)
+            if load_kg != r.load_last:
+                r.load_last = load_kg
+                changed = True
+        except Exception:
+            pass
+
+    # row_<id>_s1, _s2, ...: one input per programmed set, plus any extra sets
+    reps = list(r.reps or [])
+    for key, val in fields.items():
+        if not (key[0] == "s" and key[1:].isdigit()) or val in (None, ""):
             continue
-
-        reps = max((r.s1 or 0), (r.s2 or 0), (r.s3 or 0))
-        if not reps or not r.load_last:
+        i = int(key[1:])
+        if not 1 <= i <= max(r.sets or 0, MAX_SETS):
             continue
-
-        est_kg = epley_1rm(r.load_last, reps)
-        key = (rm_key, r.week)
-        if est_kg > best.get(key, 0.0):
-            best[key] = est_kg
-
-    # Convert to display units and sort by week
-    out = []
-    for (rm_key, week), est_kg in sorted(best.items(), key=lambda x: (x[0][1], x[0][0])):
-        if st.units == "lb":
-            val = round(est_kg * 2.20462262185, 1)
-        else:
-            val = round(est_kg, 1)
-        out.append({
-            "week": week,
-            "lift": LIFT_LABELS.get(rm_key, rm_key.title()),
-            "value": val,
-        })
-    return out
+        reps.extend([None] * (i - len(reps)))
+        try:
+            reps[i - 1] = int(val)
+        except Exception:
+            reps[i - 1] = None
+    while reps and reps[-1] is None:
+        reps.pop()
+    if reps != (r.reps or []):
+        r.reps = reps or None  # new list so the JSON column is flagged dirty
+        changed = True
+    return changed
+
+def login_enabled() -> bool:
+    # Shared PASSWORD (single athlete) or MULTI_USER accounts both require a login;
+    # with neither set every request acts as the default user
+    return bool(os.environ.get("PASSWORD") or os.environ.get("MULTI_USER"))
+
+def _login_redirect():
+    # Set g.user_id for the request, or return a redirect to the login page
+    ensure_db()
+    uid = session.get("user_id")
+    if uid is None:
+        # sessions from before accounts existed only carry "authed"
+        if login_enabled() and not session.get("authed"):
+            return redirect(url_for("login", next=request.path))
+        uid = schema.default_user_id()
+    g.user_id = uid
+    return None
 
 def require_login(f):
+    if inspect.iscoroutinefunction(f):
+        @wraps(f)
+        async def async_wrapper(*args, **kwargs):
+            return _login_redirect() or await f(*args, **kwargs)
+        return async_wrapper
+
     @wraps(f)
     def wrapper(*args, **kwargs):
-        pw = os.environ.get("PASSWORD")
-        if pw and not session.get("authed"):
-            return redirect(url_for("login", next=request.path))
-        return f(*args, **kwargs)
+        return _login_redirect() or f(*args, **kwargs)
     return wrapper
 
-def get_or_create_state(s: Session) -> State:
-    st = s.scalars(select(State)).first()
+def current_user_id() -> int:
+    return g.user_id
+
+def request_blocks() -> tuple:
+    # The signed-in user's training blocks for this request (from the State
+    # cache, so normally no query); () outside a login-protected view
+    if "user_id" not in g:
+        return ()
+    if "blocks" not in g:
+        with Session(engine) as s:
+            g.blocks = current_state(s).blocks
+    return g.blocks
+
+@app.context_processor
+def inject_blocks():
+    # base.html's week menu lists the current block's weeks
+    all_blocks = request_blocks()
+    return {"nav_block": all_blocks[-1] if all_blocks else None}
+
+@app.template_global()
+def week_label(abs_week: int) -> str:
+    return blocks.label(request_blocks(), abs_week)
+
+@app.template_global()
+def week_url(abs_week: int) -> str:
+    found = blocks.locate(request_blocks(), abs_week)
+    if found is None:
+        return url_for("dashboard")
+    return url_for("week_view", block=found[0].number, week=found[1])
+
+def get_or_create_state(s: Session, user_id: int | None = None) -> State:
+    if user_id is None:
+        user_id = current_user_id()
+    st = s.scalars(select(State).where(State.user_id == user_id)).first()
     if not st:
         st = State(
+            user_id=user_id,
             units="kg",
             bench=None,
             squat=None,
@@ -226,64 +305,122 @@ def get_or_create_state(s: Session) -> State:
         s.refresh(st)
     return st
 
-def init_week_rows(week: int, s: Session):
-    #Ensure all rows for this week exist and metadata matches the active program.
-    #Does NOT overwrite user loads/reps; only seeds Week 1/2 suggested loads from RM Test.
-    from logic import DAYS, COMPOUND_RM_MAP  # DAYS = PROGRAM_V1 list
+def seed_block_start(s: Session, st, block: blocks.BlockView):
+    # (Re)seed suggested loads in weeks 1/2 of `block` from the current 1RMs
+    for week in (1, 2):
+        if week <= block.weeks:
+            init_week_rows(block.absolute(week), s, st, force=True, block_week=week)
+
+def current_state(s: Session, user_id: int | None = None) -> state_cache.StateSnapshot:
+    # Read-only State for routes that don't write it, usually served from the
+    # per-worker cache without a query (see state_cache.py)
+    if user_id is None:
+        user_id = current_user_id()
+    def load():
+        st = get_or_create_state(s, user_id)
+        return state_cache.StateSnapshot.of(st, blocks.load(s, user_id))
+    return state_cache.current(user_id, load)
+
+def init_week_rows(week: int, s: Session, st: State | None = None, force: bool = False,
+                   block_week: int | None = None):
+    #Ensure all rows for this (absolute) week exist and metadata matches the active program.
+    #Does NOT overwrite user loads/reps; only seeds suggested loads from RM Test in
+    #weeks 1/2 of a block (block_week: the week's number within its block, default week).
+    #Loads the whole week in one query, diffs it against DAYS in memory and only
+    #writes rows that are missing or whose metadata actually changed.
+    #Weeks already synced against PROGRAM_HASH return early unless force=True
+    #(the RM test POST forces it to reseed weeks 1/2).
+    if st is None:
+        st = get_or_create_state(s)
+    uid = st.user_id
+    seed_week = week if block_week is None else block_week
+
+    sync = s.scalars(select(WeekSync).where(WeekSync.user_id == uid, WeekSync.week == week)).first()
+    if not force and sync is not None and sync.program_hash == PROGRAM_HASH:
+        return
 
-    st = get_or_create_state(s)
+    existing = {
+        (r.day, r.exercise): r
+        for r in s.scalars(select(Log).where(Log.user_id == uid, Log.week == week))
+    }
 
+    missing = []
     for day_idx, (day_title, exercises) in enumerate(DAYS, start=1):
         for ex_name, sets, rep_low, rep_high, category, increment in exercises:
-            row = s.scalars(
-                select(Log).where(
-                    Log.week == week,
-                    Log.day == day_idx,
-                    Log.exercise == ex_name,
-                )
-            ).first()
+            row = existing.get((day_idx, ex_name))
 
             if row is None:
                 row = Log(
-                    week=week, day=day_idx, day_title=day_title,
+                    user_id=uid, week=week, day=day_idx, day_title=day_title,
                     exercise=ex_name, sets=sets, rep_low=rep_low, rep_high=rep_high,
                     category=category, increment=increment,
                     load_last=None, new_load=None
                 )
                 # seed suggested for week 1/2 if RM exists
-                seed_from_rms_for_row(row, st, week, COMPOUND_RM_MAP)
-                s.add(row)
-            else:
-                # keep metadata in sync with program
-                row.day_title = day_title
-                row.sets = sets
-                row.rep_low = rep_low
-                row.rep_high = rep_high
-                row.category = category
-                row.increment = increment
-                # clear stale AMRAP if now a compound
-                if row.category != "accessory":
-                    row.amrap = None
-                # if Week 1/2 and still blank, try to seed suggested load
-                if row.load_last in (None, 0):
-                    seed_from_rms_for_row(row, st, week, COMPOUND_RM_MAP)
-
+                seed_from_rms_for_row(row, st, seed_week, COMPOUND_RM_MAP)
+                missing.append(row)
+                continue
+
+            # keep metadata in sync with program; only touch columns that differ
+            # so unchanged rows never become dirty
+            meta = {
+                "day_title": day_title,
+                "sets": sets,
+                "rep_low": rep_low,
+                "rep_high": rep_high,
+                "category": category,
+                "increment": increment,
+            }
+            for col, val in meta.items():
+                if getattr(row, col) != val:
+                    setattr(row, col, val)
+            # clear stale AMRAP if now a compound
+            if row.category != "accessory" and row.amrap is not None:
+                row.amrap = None
+            # if Week 1/2 and still blank, try to seed suggested load
+            if row.load_last in (None, 0):
+                seed_from_rms_for_row(row, st, seed_week, COMPOUND_RM_MAP)
+
+    # one executemany INSERT for the missing rows (the ORM would fall back to
+    # row-at-a-time INSERT .. RETURNING); the unit of work groups the UPDATEs
+    if missing:
+        cols = [c.key for c in Log.__table__.columns if c.key != "id"]
+        s.execute(insert(Log), [{c: getattr(r, c) for c in cols} for r in missing])
+
+    if sync is None:
+        s.add(WeekSync(user_id=uid, week=week, program_hash=PROGRAM_HASH))
+    elif sync.program_hash != PROGRAM_HASH:
+        sync.program_hash = PROGRAM_HASH
+        sync.synced_at = datetime.now(timezone.utc)
     s.commit()
 
-@app.template_filter("b64encode")
-def b64encode_filter(data: bytes):
-    return base64.b64encode(data).decode("ascii") if data else ""
-
 @app.route("/login", methods=["GET","POST"])
 def login():
     if request.method == "POST":
-        pw = os.environ.get("PASSWORD")
-        if not pw or request.form.get("password") == pw:
+        ensure_db()
+        username = (request.form.get("username") or "").strip()
+        password = request.form.get("password") or ""
+        uid = None
+        if username:
+            # per-athlete account
+            with Session(engine) as s:
+                user = s.scalars(select(User).where(User.username == username)).first()
+                if user and user.password_hash and check_password_hash(user.password_hash, password):
+                    uid = user.id
+        else:
+            # shared PASSWORD logs into the default (original single-user) account;
+            # without one, only while no login is configured at all (so never
+            # under MULTI_USER, where the default user owns the pre-upgrade data)
+            pw = os.environ.get("PASSWORD")
+            if (pw and password == pw) or not login_enabled():
+                uid = schema.default_user_id()
+        if uid is not None:
             session["authed"] = True
+            session["user_id"] = uid
             flash("Logged in.", "success")
             return redirect(request.args.get("next") or url_for("dashboard"))
-        flash("Wrong password.", "error")
-    return render_template("login.html")
+        flash("Wrong username or password.", "error")
+    return render_template("login.html", multi_user=bool(os.environ.get("MULTI_USER")))
 
 @app.route("/logout")
 def logout():
@@ -300,63 +437,107 @@ def index():
 def settings():
     ensure_db()
     with Session(engine) as s:
-        st = get_or_create_state(s)
         if request.method == "POST":
-            units = request.form.get("units","kg")
-            st.units = "lb" if units=="lb" else "kg"
+            st = get_or_create_state(s)
+            choice = request.form.get("units","kg")
+            st.units = "lb" if choice=="lb" else "kg"
             s.commit()
             flash("Settings saved.", "success")
             return redirect(url_for("settings"))
-        return render_template("settings.html", state={"units": st.units})
+        snap = current_state(s)
+        return render_template("settings.html", state={"units": snap.units},
+                               blocks=snap.blocks, default_block_weeks=config.BLOCK_WEEKS)
 
-@app.route("/history")
+@app.route("/blocks", methods=["POST"])
 @require_login
-def history():
+def start_block():
+    """Start the next training block and open its first week."""
     ensure_db()
+    try:
+        weeks = int(request.form.get("weeks") or config.BLOCK_WEEKS)
+    except ValueError:
+        weeks = 0
+    if not 1 <= weeks <= 52:
+        flash("A block is 1–52 weeks long.", "error")
+        return redirect(url_for("settings"))
+
     with Session(engine) as s:
-        today = date.today()
-        y = int(request.args.get("y", today.year))
-        m = int(request.args.get("m", today.month))
-        days_in_month = monthrange(y, m)[1]
+        st = get_or_create_state(s)
+        blk = blocks.start_next(s, st.user_id, weeks)
+        # the charted window moves with the current block
+        charts.bump_data_version(st)
+        s.commit()
+        seed_block_start(s, st, blk)
+        s.commit()
+    flash(f"Block {blk.number} started ({weeks} weeks).", "success")
+    return redirect(url_for("week_view", week=1))
 
-        # Python computes weekday of the 1st: Monday=0..Sunday=6; we want Sunday-first grids
-        first_weekday_mon0 = date(y, m, 1).weekday()  # 0..6 (Mon..Sun)
-        start_pad = (first_weekday_mon0 + 1) % 7  # 0..6 (Sun..Sat), # of blanks before day 1
+def _month_arg(name: str, default: int) -> int:
+    return int(request.args.get(name, default))
 
-        sessions = s.scalars(
-            select(WorkoutSession).where(
-                WorkoutSession.session_date >= date(y, m, 1),
-                WorkoutSession.session_date <= date(y, m, days_in_month),
-            ).order_by(WorkoutSession.session_date)
-        ).all()
-        by_day = {}
-        for sess in sessions:
-            by_day.setdefault(sess.session_date.day, []).append(sess)
+def _history_page(y: int, m: int, day_summaries, unit: str):
+    days_in_month = monthrange(y, m)[1]
 
-        return render_template("history.html",
-                               year=y, month=m, days=days_in_month,
-                               start_pad=start_pad, by_day=by_day)
+    # Python computes weekday of the 1st: Monday=0..Sunday=6; we want Sunday-first grids
+    first_weekday_mon0 = date(y, m, 1).weekday()  # 0..6 (Mon..Sun)
+    start_pad = (first_weekday_mon0 + 1) % 7  # 0..6 (Sun..Sat), # of blanks before day 1
 
-@app.route("/history/<int:y>/<int:m>/<int:d>")
-@require_login
-def history_day(y, m, d):
-    ensure_db()
-    with Session(engine) as s:
-        sess = s.scalars(
-            select(WorkoutSession).where(WorkoutSession.session_date == date(y, m, d))
-        ).first()
-        if not sess:
-            flash("No workout found for that date.", "error")
-            return redirect(url_for("history", y=y, m=m))
-
-        rows = s.scalars(select(Log).where(Log.week == sess.week, Log.day == sess.day)).all()
-        st = get_or_create_state(s)
-        def show_w(x): return None if x is None else (round(x*2.20462262185,2) if st.units=="lb" else x)
-        for r in rows:
-            r.load_last = show_w(r.load_last)
-            r.new_load = show_w(r.new_load)
+    volumes = units.display_many([d.volume_kg for d in day_summaries], unit, 0)
+    by_day = {d.session_date.day: (d, vol) for d, vol in zip(day_summaries, volumes)}
 
-        return render_template("history_day.html", sess=sess, rows=rows, units=st.units)
+    return render_template("history.html",
+                           year=y, month=m, days=days_in_month,
+                           start_pad=start_pad, by_day=by_day, units=unit)
+
+def _history_day_page(y: int, m: int, found, unit: str):
+    if not found:
+        flash("No workout found for that date.", "error")
+        return redirect(url_for("history", y=y, m=m))
+
+    sess, rows = found
+    return render_template("history_day.html", sess=sess, rows=units.log_views(rows, unit), units=unit)
+
+if reads.async_enabled(DATABASE_URL):
+    # Read-only history pages through the asyncio engine (see reads.py)
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    @app.route("/history")
+    @require_login
+    async def history():
+        today = date.today()
+        y, m = _month_arg("y", today.year), _month_arg("m", today.month)
+        async with AsyncSession(reads.async_engine(DATABASE_URL)) as s:
+            day_summaries = await reads.history_month_async(s, current_user_id(), y, m)
+        with Session(engine) as s:
+            unit = current_state(s).units  # per-worker cache; no query on a hit
+        return _history_page(y, m, day_summaries, unit)
+
+    @app.route("/history/<int:y>/<int:m>/<int:d>")
+    @require_login
+    async def history_day(y, m, d):
+        async with AsyncSession(reads.async_engine(DATABASE_URL)) as s:
+            found = await reads.history_day_async(s, current_user_id(), date(y, m, d))
+        with Session(engine) as s:
+            unit = current_state(s).units  # per-worker cache; no query on a hit
+        return _history_day_page(y, m, found, unit)
+else:
+    @app.route("/history")
+    @require_login
+    def history():
+        today = date.today()
+        y, m = _month_arg("y", today.year), _month_arg("m", today.month)
+        with Session(engine) as s:
+            day_summaries = reads.history_month(s, current_user_id(), y, m)
+            unit = current_state(s).units
+        return _history_page(y, m, day_summaries, unit)
+
+    @app.route("/history/<int:y>/<int:m>/<int:d>")
+    @require_login
+    def history_day(y, m, d):
+        with Session(engine) as s:
+            found = reads.history_day(s, current_user_id(), date(y, m, d))
+            unit = current_state(s).units
+        return _history_day_page(y, m, found, unit)
 
 @app.route("/rm-test", methods=["GET", "POST"])
 @require_login
@@ -369,19 +550,15 @@ def rm_test():
     """
     ensure_db()
     with Session(engine) as s:
-        st = get_or_create_state(s)  # holds units + 1RMs in kg
+        # holds units + 1RMs in kg; the row itself only when this request writes it
+        st = get_or_create_state(s) if request.method == "POST" else current_state(s)
 
         def to_kg(x: float | None) -> float | None:
-            if x is None:
-                return None
-            return x if st.units == "kg" else x / 2.20462262185
+            return units.to_kg(x, st.units)
 
         def from_kg(x: float | None) -> str:
             """Return stored value in display units as string."""
-            if x is None:
-                return ""
-            val = x * 2.20462262185 if st.units == "lb" else x
-            return str(round(val, 2))
+            return "" if x is None else str(units.display(x, st.units))
 
         if request.method == "POST":
             # --- parse numeric inputs (user units) ---
@@ -415,12 +592,12 @@ def rm_test():
             if ohp_in is not None:
                 st.ohp = to_kg(ohp_in)
 
+            charts.bump_data_version(st)
             s.commit()
 
-            # reseed week 1 & 2 suggested loads based on new 1RMs
+            # reseed the current block's week 1 & 2 suggested loads based on new 1RMs
             try:
-                init_week_rows(1, s)
-                init_week_rows(2, s)
+                seed_block_start(s, st, blocks.load(s, st.user_id)[-1])
                 s.commit()
             except Exception:
                 # don't kill the page on seeding errors
@@ -435,29 +612,27 @@ def rm_test():
         dead_disp  = from_kg(st.deadlift)
         ohp_disp   = from_kg(st.ohp)
 
-        progress_rows = build_1rm_progress(s, st)
+        # both histories cover the last HISTORY_WEEKS weeks (see blocks.window_start)
+        since_week = blocks.window_start(st.blocks, blocks.last_logged(s, st.user_id))
+        progress_rows = build_1rm_progress(s, st, since_week)
 
-        pr_rows = s.scalars(
-            select(PRHistory).order_by(
-                PRHistory.session_date.desc(),
-                PRHistory.id.desc(),
-            )
+        pr_rows = s.execute(
+            select(PRHistory.session_date, PRHistory.week, PRHistory.day,
+                   PRHistory.lift_key, PRHistory.pr_kg)
+            .where(PRHistory.user_id == st.user_id, PRHistory.week >= since_week)
+            .order_by(PRHistory.session_date.desc(), PRHistory.id.desc())
         ).all()
-
-        pr_history: list[dict] = []
-        for pr in pr_rows:
-            if st.units == "lb":
-                val = round(pr.pr_kg * 2.20462262185, 1)
-            else:
-                val = round(pr.pr_kg, 1)
-
-            pr_history.append({
+        pr_values = units.display_many([pr.pr_kg for pr in pr_rows], st.units, 1)
+        pr_history: list[dict] = [
+            {
                 "date": pr.session_date.isoformat(),
                 "week": pr.week,
                 "day": pr.day,
                 "lift": LIFT_LABELS.get(pr.lift_key, pr.lift_key.title()),
                 "value": val,
-            })
+            }
+            for pr, val in zip(pr_rows, pr_values)
+        ]
 
         ctx = {
             "units": st.units or "kg",
@@ -470,244 +645,435 @@ def rm_test():
         }
         return render_template("rm_test.html", **ctx)
 
+def save_week_inputs(s: Session, st: State, week: int, form) -> dict:
+    """
+    Apply one week-page submission (the modal's day form or the bodyweight
+    form) without committing. form maps the page's field names to strings.
+    Only a form carrying save_day (the day's Save) records a WorkoutSession,
+    dated session_date (the client's YYYY-MM-DD, else today in UTC), and
+    checks that day for PRs; other edits just update their rows.
+    Returns {"day", "rows" (the week's Log rows), "changed", "pr_hits"}.
+    """
+    # -------- Daily Save & timer (one day at a time via modal) --------
+    save_day = form.get("save_day")
+    day_int = int(save_day) if save_day else None
+    try:
+        session_date = date.fromisoformat(form.get("session_date") or "")
+    except ValueError:
+        session_date = datetime.now(timezone.utc).date()
+    new_session = False
+    if day_int is not None:
+        # timer fields
+        start_iso = form.get(f"start_{day_int}")
+        end_iso   = form.get(f"end_{day_int}")
+
+        started_at = ended_at = None
+        duration_seconds = None
+        try:
+            if start_iso:
+                started_at = datetime.fromisoformat(start_iso.replace("Z", "+00:00"))
+            if end_iso:
+                ended_at = datetime.fromisoformat(end_iso.replace("Z", "+00:00"))
+            if started_at and ended_at:
+                duration_seconds = int((ended_at - started_at).total_seconds())
+        except Exception:
+            pass
+
+        # record a session row for the day it was trained
+        sess = s.execute(
+            select(WorkoutSession).where(
+                WorkoutSession.user_id == st.user_id,
+                WorkoutSession.week == week,
+                WorkoutSession.day == day_int,
+                WorkoutSession.session_date == session_date,
+            )
+        ).scalar_one_or_none()
+
+        if sess is None:
+            sess = WorkoutSession(
+                user_id=st.user_id, week=week, day=day_int, session_date=session_date,
+                started_at=started_at, ended_at=ended_at,
+                duration_seconds=duration_seconds
+            )
+            s.add(sess)
+            new_session = True  # may move the charted window (blocks.last_logged)
+        else:
+            if started_at: sess.started_at = started_at
+            if ended_at:   sess.ended_at = ended_at
+            if duration_seconds is not None:
+                sess.duration_seconds = duration_seconds
+
+    # -------- Bodyweight (stored in kg) --------
+    bw = form.get("bodyweight")
+    bw_changed = False
+    if bw not in (None, ""):
+        try:
+            bw_val = float(bw)
+            bw_kg = units.to_kg(bw_val, st.units)
+            existing = s.scalars(select(Progress).where(
+                Progress.user_id == st.user_id, Progress.week == week)).first()
+            if existing:
+                bw_changed = existing.bodyweight != bw_kg
+                existing.bodyweight = bw_kg
+            else:
+                s.add(Progress(user_id=st.user_id, week=week, bodyweight=bw_kg))
+                bw_changed = True
+        except Exception:
+            pass
+
+    # -------- Apply submitted inputs; progression for changed rows only --------
+    submitted = submitted_row_fields(form)
+    rows = s.scalars(
+        select(Log).where(Log.user_id == st.user_id, Log.week == week).order_by(Log.day, Log.id)
+    ).all()
+    touched = [r for r in rows if r.id in submitted and (day_int is None or r.day == day_int)]
+    changed = [r for r in touched if apply_row_fields(r, submitted[r.id], st.units)]
+
+    if changed:
+        # a save changes a handful of rows: the scalar rule beats packing them
+        # into arrays for compute_new_loads (meant for whole columns)
+        for r in changed:
+            r.new_load = compute_new_load({
+                "load_last": r.load_last,
+                "rep_high": r.rep_high,
+                "increment": r.increment,
+                "category": r.category,
+                "sets": r.sets,
+                "reps": r.reps,
+                "amrap": amrap_reps(r.reps, r.sets) if r.category == "accessory" else None,
+            })
+
+        # keep the precomputed estimated-1RM table in step, for the lifts that moved
+        lift_keys = {ESTIMATED_RM_MAP[r.exercise] for r in changed if r.exercise in ESTIMATED_RM_MAP}
+        refresh_estimated_rms(s, st.user_id, week, rows, lift_keys)
+
+    app.logger.info("week %s save (day %s): %d rows touched, %d changed",
+                    week, save_day or "-", len(touched), len(changed))
+
+    # ---- PR detection (Epley) for the saved day only; logged to PRHistory in kg ----
+    # over every submitted row, since edits synced before the Save already
+    # changed them; a PR already recorded on State doesn't fire again
+    pr_hits = []
+    if day_int is not None and touched:
+        pr_hits = update_1rms_from_rows(st, touched)
+        for key, old_kg, new_kg in pr_hits:
+            s.add(PRHistory(user_id=st.user_id, lift_key=key, pr_kg=new_kg,
+                            week=week, day=day_int, session_date=session_date))
+
+    # the history calendar's per-day totals (sets, volume, duration) for every
+    # date the saved or edited days were logged on
+    for day in sorted({r.day for r in changed} | ({day_int} - {None})):
+        summaries.refresh_week_day(s, st.user_id, week, day)
+
+    if changed or bw_changed or new_session:
+        charts.bump_data_version(st)
+    return {"day": day_int, "rows": rows, "changed": changed, "pr_hits": pr_hits}
+
+def _week_nav(all_blocks: tuple, blk: blocks.BlockView, week: int):
+    # (prev, next) week page URLs, crossing into the neighbouring blocks; None at either end
+    i = all_blocks.index(blk)
+    if week > 1:
+        prev = url_for("week_view", block=blk.number, week=week - 1)
+    elif i > 0:
+        prev = url_for("week_view", block=all_blocks[i - 1].number, week=all_blocks[i - 1].weeks)
+    else:
+        prev = None
+    if week < blk.weeks:
+        nxt = url_for("week_view", block=blk.number, week=week + 1)
+    elif i + 1 < len(all_blocks):
+        nxt = url_for("week_view", block=all_blocks[i + 1].number, week=1)
+    else:
+        nxt = None
+    return prev, nxt
+
 @app.route("/week/<int:week>", methods=["GET", "POST"])
+@app.route("/block/<int:block>/week/<int:week>", methods=["GET", "POST"])
 @require_login
-def week_view(week: int):
+def week_view(week: int, block: int | None = None):
+    # week counts from 1 within the block (default: the current one); rows are
+    # stored under the absolute week, see blocks.py
     ensure_db()
 
-    if week < 1 or week > 12:
-        flash("Week must be 1–12.", "error")
-        return redirect(url_for("dashboard"))
-
     with Session(engine) as s:
-        st = get_or_create_state(s)
-        init_week_rows(week, s)  # seeds Program V1.0 rows if missing, syncs metadata if you added that
+        snap = current_state(s)
+        blk = snap.blocks[-1] if block is None else blocks.find(snap.blocks, block)
+        if blk is None or week < 1 or week > blk.weeks:
+            flash("No such block/week.", "error")
+            return redirect(url_for("dashboard"))
+        abs_week = blk.absolute(week)
+
+        st = get_or_create_state(s) if request.method == "POST" else snap
+        # seeds Program V1.0 rows if missing, syncs metadata if you added that
+        init_week_rows(abs_week, s, st, block_week=week)
 
         if request.method == "POST":
-            # -------- Daily Save & timer (one day at a time via modal) --------
-            save_day = request.form.get("save_day")
-            if save_day:
-                day_int = int(save_day)
-                # timer fields
-                start_iso = request.form.get(f"start_{day_int}")
-                end_iso   = request.form.get(f"end_{day_int}")
-
-                started_at = ended_at = None
-                duration_seconds = None
-                try:
-                    if start_iso:
-                        started_at = datetime.fromisoformat(start_iso.replace("Z", "+00:00"))
-                    if end_iso:
-                        ended_at = datetime.fromisoformat(end_iso.replace("Z", "+00:00"))
-                    if started_at and ended_at:
-                        duration_seconds = int((ended_at - started_at).total_seconds())
-                except Exception:
-                    pass
-
-                # record a session row for today
-                today = datetime.now(timezone.utc).date()
-                sess = s.execute(
-                    select(WorkoutSession).where(
-                        WorkoutSession.week == week,
-                        WorkoutSession.day == day_int,
-                        WorkoutSession.session_date == today,
-                    )
-                ).scalar_one_or_none()
-
-                if sess is None:
-                    sess = WorkoutSession(
-                        week=week, day=day_int, session_date=today,
-                        started_at=started_at, ended_at=ended_at,
-                        duration_seconds=duration_seconds
-                    )
-                    s.add(sess)
-                else:
-                    if started_at: sess.started_at = started_at
-                    if ended_at:   sess.ended_at = ended_at
-                    if duration_seconds is not None:
-                        sess.duration_seconds = duration_seconds
-
-            # -------- Bodyweight (stored in kg) --------
-            bw = request.form.get("bodyweight")
-            if bw not in (None, ""):
-                try:
-                    bw_val = float(bw)
-                    bw_kg = bw_val if st.units == "kg" else bw_val / 2.20462262185
-                    existing = s.scalars(select(Progress).where(Progress.week == week)).first()
-                    if existing:
-                        existing.bodyweight = bw_kg
-                    else:
-                        s.add(Progress(week=week, bodyweight=bw_kg))
-                except Exception:
-                    pass
-
-            # -------- Parse all inputs for the week, compute progression --------
-            rows = s.scalars(select(Log).where(Log.week == week)).all()
-            for r in rows:
-                # Load (this week) — base for progression; store as kg
-                load_field = request.form.get(f"row_{r.id}_load")
-                if load_field not in (None, ""):
-                    try:
-                        load_val = float(load_field)
-                        load_kg = load_val if st.units == "kg" else load_val / 2.20462262185
-                        r.load_last = load_kg
-                    except Exception:
-                        pass
-
-                # Reps (S1–S3)
-                for k in ["s1", "s2", "s3"]:
-                    val = request.form.get(f"row_{r.id}_{k}")
-                    if val not in (None, ""):
-                        try:
-                            setattr(r, k, int(val))
-                        except Exception:
-                            setattr(r, k, None)
-
-                # Treat S3 as AMRAP for accessories; ignore AMRAP separately
-                amrap_reps = r.s3 if r.category == "accessory" else None
-
-                data = {
-                    "load_last": r.load_last,
-                    "rep_high": r.rep_high,
-                    "increment": r.increment,
-                    "category": r.category,
-                    "sets": r.sets,
-                    "s1": r.s1, "s2": r.s2, "s3": r.s3,
-                    "amrap": amrap_reps,
-                }
-                r.new_load = compute_new_load(data)
-
-            # ---- PR detection (Epley) for the saved day only ----
-            pr_hits = []
-            day_int = None
-            if save_day:
-                try:
-                    day_int = int(save_day)
-                    rows_for_day = [r for r in rows if r.day == day_int]
-                    pr_hits = update_1rms_from_rows(st, rows_for_day)
-                except Exception:
-                    pr_hits = []
-
-            # flash any PR messages AND log PRs to PRHistory
-            if pr_hits and day_int is not None:
-                # determine session_date (use today's date in UTC; matches WorkoutSession)
-                today = datetime.now(timezone.utc).date()
-
-                for key, old_kg, new_kg in pr_hits:
-                    # log PR to history in kg
-                    s.add(PRHistory(
-                        lift_key=key,
-                        pr_kg=new_kg,
-                        week=week,
-                        day=day_int,
-                        session_date=today,
-                    ))
-
-                    # user-facing notification in their chosen units
-                    if st.units == "lb":
-                        old_disp = round(old_kg * 2.20462262185, 1) if old_kg else 0
-                        new_disp = round(new_kg * 2.20462262185, 1)
-                        unit_lbl = "lb"
-                    else:
-                        old_disp = round(old_kg, 1) if old_kg else 0
-                        new_disp = round(new_kg, 1)
-                        unit_lbl = "kg"
-
-                    lift_label = {
-                        "bench": "Bench",
-                        "squat": "Squat",
-                        "deadlift": "Deadlift",
-                        "ohp": "Overhead Press",
-                    }[key]
-                    flash(f"New 1 RM! {lift_label}: {old_disp} → {new_disp} {unit_lbl}", "success")
+            result = save_week_inputs(s, st, abs_week, request.form)
+
+            # flash any PR messages in the user's chosen units
+            for key, old_kg, new_kg in result["pr_hits"]:
+                old_disp = units.display(old_kg, st.units, 1) if old_kg else 0
+                new_disp = units.display(new_kg, st.units, 1)
+                flash(f"New 1 RM! {LIFT_LABELS[key]}: {old_disp} → {new_disp} {st.units}", "success")
 
             s.commit()
             flash(f"Week {week} saved.", "success")
-            return redirect(url_for("week_view", week=week))
+            return redirect(url_for("week_view", block=block, week=week))
 
         # -------- GET render --------
-        rows = s.scalars(
-            select(Log).where(Log.week == week).order_by(Log.day, Log.id)
-        ).all()
-
-        def display_w(x):
-            if x is None:
-                return None
-            return round(x * 2.20462262185, 2) if st.units == "lb" else x
-
+        views = units.log_views(reads.week_rows(s, st.user_id, abs_week), st.units)
         grouped = []
         for day_idx in range(1, 8):
-            sub = [r for r in rows if r.day == day_idx]
+            sub = [r for r in views if r.day == day_idx]
             title = sub[0].day_title if sub else f"Day {day_idx}"
-            for r in sub:
-                r.load_last = display_w(r.load_last)
-                r.new_load = display_w(r.new_load)
             grouped.append((title, sub))
 
         # Bodyweight (display units)
         bw_val = None
-        prog = s.scalars(select(Progress).where(Progress.week == week)).first()
+        prog = s.scalars(select(Progress).where(
+            Progress.user_id == st.user_id, Progress.week == abs_week)).first()
         if prog:
-            bw_val = prog.bodyweight if st.units == "kg" else round(prog.bodyweight * 2.20462262185, 1)
+            bw_val = units.display(prog.bodyweight, st.units, 1)
+
+        prev_url, next_url = _week_nav(snap.blocks, blk, week)
+        return render_template("week.html", week=week, abs_week=abs_week, block=blk,
+                               prev_url=prev_url, next_url=next_url,
+                               grouped=grouped, bw=bw_val, units=st.units)
+
+@app.route("/api/week/<int:week>/day/<int:day>", methods=["POST"])
+@require_login
+def api_save_day(week: int, day: int):
+    """
+    Save one day from the week modal without a page reload. week is the
+    absolute week (Log.week). Takes a JSON object of the modal form's fields
+    (row_<id>_load, row_<id>_s<n>, start_<day>, end_<day>) and returns the
+    day's loads and new loads plus any PR hits.
+    """
+    ensure_db()
+    if week < 1 or day < 1 or day > len(DAYS):
+        return {"error": "no such week/day"}, 404
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return {"error": "expected a JSON object of form fields"}, 400
+    form = {k: "" if v is None else str(v) for k, v in data.items()}
+    form["save_day"] = str(day)
+
+    with Session(engine) as s:
+        if week > current_state(s).blocks[-1].end_week:
+            return {"error": "no such week/day"}, 404
+        st = get_or_create_state(s)
+        result = save_week_inputs(s, st, week, form)
+
+        # built before commit, which would expire every row
+        views = units.log_views([r for r in result["rows"] if r.day == day], st.units)
+        body = {
+            "week": week,
+            "day": day,
+            "units": st.units,
+            "changed": len(result["changed"]),
+            "rows": [{"id": v.id, "load_last": v.load_last, "new_load": v.new_load} for v in views],
+            "prs": [
+                {"lift": LIFT_LABELS[key],
+                 "old": units.display(old_kg, st.units, 1) if old_kg else 0,
+                 "new": units.display(new_kg, st.units, 1)}
+                for key, old_kg, new_kg in result["pr_hits"]
+            ],
+        }
+        s.commit()
+        return body
+
+@app.route("/api/sync", methods=["POST"])
+@require_login
+def api_sync():
+    """
+    Bulk upsert of sets queued offline by week.html. Takes {"entries": [{"week",
+    "day", "exercise", "load", "reps", "saved", "date", "start", "end"}, ...]} keyed
+    on (week, day, exercise). Values are absolute (load in display units, reps per
+    set, None for blank), so replaying a batch changes nothing and later entries for
+    a key win. Only entries queued by Save Day carry saved; they record the day's
+    WorkoutSession on `date`, the client's calendar date when it was saved.
+    All entries are merged in one transaction; returns the affected days' loads and
+    new loads, PR hits and any entries that matched no row.
+    """
+    ensure_db()
+    data = request.get_json(silent=True)
+    entries = data.get("entries") if isinstance(data, dict) else None
+    if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+        return {"error": "expected {\"entries\": [...]}"}, 400
+    try:
+        keys = [(int(e["week"]), int(e["day"]), str(e["exercise"])) for e in entries]
+    except (KeyError, TypeError, ValueError):
+        return {"error": "every entry needs week, day and exercise"}, 400
+    for e in entries:
+        reps = e.get("reps")
+        if reps is not None and not (isinstance(reps, list) and all(
+                rep is None or (isinstance(rep, int) and not isinstance(rep, bool)) for rep in reps)):
+            return {"error": "reps must be a list of integers or null"}, 400
+
+    with Session(engine) as s:
+        st = get_or_create_state(s)
+        weeks = {w for (w, _, _) in keys}
+        ids = {
+            (w, d, ex): rid
+            for rid, w, d, ex in s.execute(
+                select(Log.id, Log.week, Log.day, Log.exercise)
+                .where(Log.user_id == st.user_id, Log.week.in_(weeks)))
+        }
 
-        return render_template("week.html", week=week, grouped=grouped, bw=bw_val, units=st.units)
+        # one form-shaped dict per (week, day), as save_week_inputs expects
+        forms, unknown = {}, []
+        for key, e in zip(keys, entries):
+            rid = ids.get(key)
+            if rid is None:
+                unknown.append({"week": key[0], "day": key[1], "exercise": key[2]})
+                continue
+            week, day, _ = key
+            form = forms.setdefault((week, day), {})
+            if e.get("saved"):
+                form["save_day"] = str(day)
+                if e.get("date"):
+                    form["session_date"] = str(e["date"])
+            if e.get("load") is not None:
+                form[f"row_{rid}_load"] = str(e["load"])
+            for i, rep in enumerate(e.get("reps") or [], start=1):
+                if rep is not None:
+                    form[f"row_{rid}_s{i}"] = str(rep)
+            for field in ("start", "end"):
+                if e.get(field):
+                    form[f"{field}_{day}"] = str(e[field])
+
+        rows, prs = [], []
+        for (week, day), form in sorted(forms.items()):
+            result = save_week_inputs(s, st, week, form)
+            rows += [
+                {"id": v.id, "week": week, "day": day, "exercise": v.exercise,
+                 "load_last": v.load_last, "new_load": v.new_load}
+                for v in units.log_views([r for r in result["rows"] if r.day == day], st.units)
+            ]
+            prs += [
+                {"week": week, "day": day, "lift": LIFT_LABELS[key],
+                 "old": units.display(old_kg, st.units, 1) if old_kg else 0,
+                 "new": units.display(new_kg, st.units, 1)}
+                for key, old_kg, new_kg in result["pr_hits"]
+            ]
+        body = {"units": st.units, "rows": rows, "prs": prs, "unknown": unknown}
+        s.commit()
+        return body
 
 @app.route("/dashboard")
 @require_login
 def dashboard():
     ensure_db()
+    # mode=client draws the charts in the browser from /api/dashboard/series,
+    # keeping matplotlib off the request path entirely
+    mode = request.args.get("mode", os.environ.get("DASHBOARD_MODE", "server"))
     with Session(engine) as s:
-        st = get_or_create_state(s)
-        # BW chart
-        progs = s.scalars(select(Progress).order_by(Progress.week)).all()
-        fig, ax = plt.subplots(figsize=(7,3))
-        if progs:
-            x = [p.week for p in progs]
-            y = [p.bodyweight if st.units=='kg' else p.bodyweight*2.20462262185 for p in progs]
-            ax.plot(x, y)
-            ax.set_ylabel(f"Body Weight ({st.units})")
-        ax.set_xlabel("Week"); ax.grid(True, alpha=0.3)
-        bio = io.BytesIO(); fig.tight_layout(); fig.savefig(bio, format="png", dpi=110); plt.close(fig); bio.seek(0)
-        bw_png = bio.read()
-
-        # Lift charts
-        lifts = ["Back Squat","Flat Barbell Bench Press","Deadlift","Overhead Press (Barbell/DB)"]
-        lift_pngs = {}
-        for lift in lifts:
-            series = s.execute(select(Log.week, Log.new_load, Log.load_last).where(Log.exercise==lift).order_by(Log.week)).all()
-            if not series: continue
-            weeks = [w for (w,_,_) in series]
-            loads = [(nl if nl is not None else ll) for (_,nl,ll) in series]
-            loads = [ (l*2.20462262185 if (l is not None and st.units=='lb') else l) for l in loads ]
-            fig2, ax2 = plt.subplots(figsize=(7,3))
-            ax2.plot(weeks, loads); ax2.set_xlabel("Week"); ax2.set_ylabel(f"{lift} ({st.units})")
-            ax2.grid(True, alpha=0.3)
-            bio2 = io.BytesIO(); fig2.tight_layout(); fig2.savefig(bio2, format="png", dpi=110); plt.close(fig2); bio2.seek(0)
-            lift_pngs[lift] = bio2.read()
-
-        return render_template("dashboard.html", bw_png=bw_png, lift_pngs=lift_pngs, units=st.units)
+        st = current_state(s)
+        if mode == "client":
+            return render_template("dashboard_client.html", units=st.units)
+
+        # only which lifts have data; each <img> request renders its own chart
+        series = charts.get_series(s, st)
+        lift_charts = [(lift, charts.chart_slug(lift)) for lift in series["lifts"]]
+
+        return render_template("dashboard.html", lift_charts=lift_charts, units=st.units)
+
+def _conditional(etag: str, build) -> Response:
+    # 304 when the client already holds this version, otherwise build() the body.
+    # Always revalidate: the content changes whenever data_version does.
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = build()
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+@app.route("/dashboard/chart/<name>.png")
+@require_login
+def dashboard_chart(name: str):
+    """Serve one dashboard chart with a strong ETag so revisits get a 304."""
+    ensure_db()
+    with Session(engine) as s:
+        st = current_state(s)
+
+        def build():
+            png = charts.get_chart_png(s, st, name)
+            if png is None:
+                abort(404)
+            return Response(png, mimetype="image/png")
+
+        return _conditional(charts.chart_etag(st, name), build)
+
+@app.route("/api/dashboard/series")
+@require_login
+def dashboard_series():
+    """Compact week-indexed chart data for the client-side dashboard."""
+    ensure_db()
+    with Session(engine) as s:
+        st = current_state(s)
+
+        def build():
+            body = json.dumps(charts.get_series(s, st), separators=(",", ":"))
+            return Response(body, mimetype="application/json")
+
+        return _conditional(charts.chart_etag(st, "series"), build)
+
+def _export_since_week() -> int:
+    # ?weeks=N exports the last N weeks (counted like the dashboard window); default everything
+    try:
+        weeks = int(request.args.get("weeks", 0))
+    except ValueError:
+        weeks = 0
+    if weeks <= 0:
+        return 1
+    with Session(engine) as s:
+        return blocks.window_start(request_blocks(), blocks.last_logged(s, current_user_id()), weeks)
 
 @app.route("/export.xlsx")
 @require_login
 def export_xlsx():
     ensure_db()
+    since_week = _export_since_week()
+    with Session(engine) as s:
+        out = export.xlsx_file(s, current_user_id(), since_week)
+    return send_file(out, as_attachment=True, download_name="hypertrophy_export.xlsx",
+                     mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+@app.route("/export/<table>.csv")
+@require_login
+def export_csv(table: str):
+    ensure_db()
+    if table not in export.TABLES:
+        abort(404)
+    resp = Response(export.iter_csv(engine, table, current_user_id(), _export_since_week()),
+                    mimetype="text/csv")
+    resp.headers["Content-Disposition"] = f"attachment; filename=hypertrophy_{table}.csv"
+    return resp
+
+@app.route("/export/<table>.parquet")
+@require_login
+def export_parquet(table: str):
+    ensure_db()
+    if table not in export.TABLES:
+        abort(404)
+    if not export.parquet_available():
+        flash("Parquet export needs pyarrow installed (pip install pyarrow).", "error")
+        return redirect(url_for("dashboard"))
+    since_week = _export_since_week()
     with Session(engine) as s:
-        logs = s.scalars(select(Log)).all()
-        prog = s.scalars(select(Progress)).all()
-        df_logs = pd.DataFrame([{
-            "week": r.week, "day": r.day, "day_title": r.day_title, "exercise": r.exercise,
-            "sets": r.sets, "rep_low": r.rep_low, "rep_high": r.rep_high, "category": r.category,
-            "increment": r.increment, "load_last": r.load_last, "s1": r.s1, "s2": r.s2, "s3": r.s3,
-            "amrap": r.amrap, "new_load": r.new_load, "notes": r.notes
-        } for r in logs])
-        df_prog = pd.DataFrame([{"week": p.week, "bodyweight": p.bodyweight} for p in prog])
-        bio = io.BytesIO()
-        with pd.ExcelWriter(bio, engine="openpyxl") as w:
-            (df_logs if not df_logs.empty else pd.DataFrame()).to_excel(w, sheet_name="log", index=False)
-            (df_prog if not df_prog.empty else pd.DataFrame()).to_excel(w, sheet_name="progress", index=False)
-        bio.seek(0)
-        return send_file(bio, as_attachment=True, download_name="hypertrophy_export.xlsx",
-                         mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        out = export.parquet_file(s, table, current_user_id(), since_week)
+    return send_file(out, as_attachment=True, download_name=f"hypertrophy_{table}.parquet",
+                     mimetype="application/vnd.apache.parquet")
+
+@app.route("/metrics")
+def metrics_view():
+    # Prometheus scrape target; disabled unless METRICS_TOKEN is set
+    ok = metrics.authorized()
+    if ok is None:
+        abort(404)
+    if not ok:
+        abort(401)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 @app.route("/debug-state")
 @require_login
@@ -715,7 +1081,7 @@ def debug_state():
     """Show current State row for quick inspection."""
     ensure_db()
     with Session(engine) as s:
-        st = get_or_create_state(s)
+        st = current_state(s)
         return {
             "units": st.units,
             "bench": st.bench,
@@ -727,10 +1093,38 @@ def debug_state():
 @app.route("/debug-db")
 @require_login
 def debug_db():
-    #Show which DATABASE_URL the app is actually using.
+    #Show which DATABASE_URL the app is actually using (password masked).
+    #Under MULTI_USER only the default (operator) user may look.
+    if os.environ.get("MULTI_USER") and g.user_id != schema.default_user_id():
+        abort(404)
+    url = os.environ.get("DATABASE_URL")
     return {
-        "DATABASE_URL": os.environ.get("DATABASE_URL", "NO DATABASE_URL SET"),
+        "DATABASE_URL": make_url(url).render_as_string(hide_password=True) if url else "NO DATABASE_URL SET",
+        "schema_version": schema.ready_version(),
+        "bootstrap_checks": schema.bootstrap_checks,
     }, 200
 
+@app.cli.command("create-user")
+@click.argument("username")
+@click.password_option()
+def create_user_command(username, password):
+    """Create an athlete account (used when MULTI_USER is set)."""
+    ensure_db()
+    with Session(engine) as s:
+        if s.scalars(select(User).where(User.username == username)).first():
+            raise click.ClickException(f"User {username!r} already exists.")
+        s.add(User(username=username, password_hash=generate_password_hash(password)))
+        s.commit()
+    print(f"Created user {username}.")
+
+@app.cli.command("rebuild-rm-progress")
+def rebuild_rm_progress_command():
+    """Backfill the estimated-1RM progress table from the full log history."""
+    ensure_db()
+    with Session(engine) as s:
+        n = summaries.rebuild_estimated_rms(s)
+        s.commit()
+    print(f"Rebuilt {n} estimated 1RM rows.")
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)), debug=True)
@@ -0,0 +1,635 @@
+"""
+Performance benchmarks for the tracker.
+
+    python bench.py startup        # import time + RSS of a cold worker
+    python bench.py export         # peak memory of the streaming exports vs. log size
+    python bench.py users          # week/dashboard latency as the number of athletes grows
+    python bench.py progression    # batch vs. per-row progression timings
+    python bench.py load           # throughput and p99 per gunicorn worker/pool configuration
+    python bench.py reads          # history reads: thread pool + sync engine vs. asyncio engine
+    python bench.py rows           # week pages: ORM entities vs. column projections (time + memory)
+
+Benchmarks run against a throwaway SQLite database (load and reads use
+DATABASE_URL instead when it is set). Pass/fail checks (query counts, query
+plans, progression equivalence, login) live in tests/ and run under pytest;
+they share fresh_app() and the seeding helpers below.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def rss_kb() -> int:
+    # Current resident set size in kB (Linux), falling back to peak RSS
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+# ------------ startup: cold-start import cost ------------
+_STARTUP_PROBE = r"""
+import json, sys, time
+sys.path.insert(0, {here!r})
+from bench import rss_kb
+out = {{"interpreter_rss_kb": rss_kb()}}
+t = time.perf_counter()
+import app
+out["import_app_s"] = time.perf_counter() - t
+out["import_app_rss_kb"] = rss_kb()
+t = time.perf_counter()
+app.charts._pyplot()
+import openpyxl
+out["heavy_deps_s"] = time.perf_counter() - t
+out["heavy_deps_rss_kb"] = rss_kb()
+print(json.dumps(out))
+"""
+
+def bench_startup(args):
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    runs = []
+    for _ in range(args.runs):
+        # fresh interpreter per run so nothing is already imported
+        proc = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE.format(here=HERE)],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    def med(key):
+        vals = sorted(r[key] for r in runs)
+        return vals[len(vals) // 2]
+
+    print(f"runs: {args.runs}")
+    print(f"interpreter            rss {med('interpreter_rss_kb') / 1024:7.1f} MB")
+    print(f"import app     {med('import_app_s') * 1000:7.1f} ms  rss {med('import_app_rss_kb') / 1024:7.1f} MB")
+    print(f"+ heavy deps   {med('heavy_deps_s') * 1000:7.1f} ms  rss {med('heavy_deps_rss_kb') / 1024:7.1f} MB"
+          "   (first /dashboard or /export.xlsx)")
+
+def temp_db_url() -> str:
+    return "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="ht-bench-"), "bench.db")
+
+def temp_engine():
+    # Throwaway SQLite database with the current schema
+    from sqlalchemy import create_engine
+    import schema
+    engine = create_engine(temp_db_url(), future=True)
+    schema.bootstrap(engine, force=True)
+    return engine
+
+def fresh_app(url: str | None = None):
+    """
+    The app module, bootstrapped on a throwaway SQLite database (or `url`).
+    app binds its engine at import, so the first call points DATABASE_URL at
+    the database before importing it; later calls (one per test) rebind
+    app.engine and drop the per-process caches keyed on user ids.
+    """
+    url = url or temp_db_url()
+    if "app" not in sys.modules:
+        os.environ["DATABASE_URL"] = url
+        import app
+    else:
+        from sqlalchemy import create_engine
+        import app
+        import charts
+        import config
+        import metrics
+        import state_cache
+        app.engine.dispose()
+        app.DATABASE_URL = url
+        app.engine = create_engine(url, **config.engine_options(url))
+        metrics.instrument(app.engine)
+        state_cache._cache.clear()
+        charts._cache.clear()
+    app.ensure_db(force=True)
+    return app
+
+def seed_log(engine, weeks: int, user_ids=None) -> int:
+    # Fill `weeks` weeks of the program with plausible logged sets for each
+    # user (default: the default user). Returns the number of Log rows written.
+    from sqlalchemy import insert
+    from logic import DAYS
+    from models import Log, Progress
+    import schema
+    if user_ids is None:
+        user_ids = [schema.default_user_id()]
+
+    written = 0
+    with engine.begin() as conn:
+        for uid in user_ids:
+            rows = []
+            for week in range(1, weeks + 1):
+                for day_idx, (day_title, exercises) in enumerate(DAYS, start=1):
+                    for ex_name, sets, rep_low, rep_high, category, increment in exercises:
+                        load = 20.0 + week * increment
+                        rows.append(dict(user_id=uid, week=week, day=day_idx, day_title=day_title,
+                                         exercise=ex_name, sets=sets, rep_low=rep_low,
+                                         rep_high=rep_high, category=category, increment=increment,
+                                         load_last=load, reps=[rep_high] * (sets - 1) + [rep_low],
+                                         amrap=None, new_load=load + increment, notes=None))
+            for i in range(0, len(rows), 5000):
+                conn.execute(insert(Log), rows[i:i + 5000])
+            conn.execute(insert(Progress), [dict(user_id=uid, week=w, bodyweight=80.0)
+                                            for w in range(1, weeks + 1)])
+            written += len(rows)
+    return written
+
+def timed_get(client, url: str, reps: int) -> list:
+    # Latencies in ms of `reps` GETs after one warm-up request
+    assert client.get(url).status_code == 200, url
+    out = []
+    for _ in range(reps):
+        t = time.perf_counter()
+        client.get(url)
+        out.append((time.perf_counter() - t) * 1000)
+    return sorted(out)
+
+def pct(sorted_vals: list, q: float) -> float:
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+# ------------ export: streaming export memory ------------
+def bench_export(args):
+    from sqlalchemy.orm import Session
+    import export
+    import schema
+
+    fmts = ["xlsx", "csv"] + (["parquet"] if export.parquet_available() else [])
+    def run(fmt, engine):
+        if fmt == "xlsx":
+            with Session(engine) as s:
+                export.xlsx_file(s, schema.default_user_id()).close()
+        elif fmt == "csv":
+            for _ in export.iter_csv(engine, "log", schema.default_user_id()):
+                pass
+        else:
+            with Session(engine) as s:
+                export.parquet_file(s, "log", schema.default_user_id()).close()
+
+    # warm-up so one-off library initialisation doesn't count towards the first peak
+    warm = temp_engine()
+    seed_log(warm, 1)
+    for fmt in fmts:
+        run(fmt, warm)
+
+    print(f"{'log rows':>9}  " + "  ".join(f"{f + ' peak MB':>15} {'s':>6}" for f in fmts))
+    for rows_wanted in args.rows:
+        engine = temp_engine()
+        n = seed_log(engine, max(1, rows_wanted // 29))
+        cols = []
+        for fmt in fmts:
+            tracemalloc.start()
+            t = time.perf_counter()
+            run(fmt, engine)
+            elapsed = time.perf_counter() - t
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            cols.append(f"{peak / 2**20:15.1f} {elapsed:6.2f}")
+        print(f"{n:9d}  " + "  ".join(cols))
+
+# ------------ users: tenancy scaling ------------
+def bench_users(args):
+    from sqlalchemy import insert, select
+    from models import User
+
+    app = fresh_app()
+    client = app.app.test_client()
+    routes = ["/week/2", "/api/dashboard/series", "/rm-test", "/history"]
+
+    print(f"{'users':>6} {'log rows':>9}  " + "  ".join(f"{r + ' p50/p95 ms':>30}" for r in routes))
+    total_rows = 0
+    have = 0
+    for target in args.users:
+        with app.engine.begin() as conn:
+            conn.execute(insert(User), [{"username": f"athlete{i}"} for i in range(have, target)])
+            new_ids = conn.execute(select(User.id).where(User.username.like("athlete%"))
+                                   .order_by(User.id).offset(have)).scalars().all()
+        total_rows += seed_log(app.engine, args.weeks, new_ids)
+        have = target
+
+        # measure as a user in the middle of the table
+        with client.session_transaction() as sess:
+            sess["user_id"] = new_ids[len(new_ids) // 2]
+        cols = []
+        for url in routes:
+            lat = timed_get(client, url, args.reps)
+            cols.append(f"{pct(lat, 0.5):14.2f} / {pct(lat, 0.95):6.2f}")
+        print(f"{target:6d} {total_rows:9d}  " + "  ".join(f"{c:>30}" for c in cols))
+
+# ------------ progression: batch vs. scalar ------------
+def random_progression_rows(n: int, seed: int) -> list:
+    # Simulated Log rows covering the edge cases: missing loads and
+    # increments, blank or extra sets, 0..5 programmed sets
+    import random
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        sets = rng.randint(0, 5)
+        reps = [rng.choice([None, 0, rng.randint(1, 35)]) for _ in range(rng.randint(0, 6))]
+        rows.append({
+            "load_last": rng.choice([None, "", round(rng.uniform(0, 300), 2)]),
+            "rep_high": rng.choice([1, 5, 6, 8, 9, 10, 11, 12, 15, 18, 20, 25]),
+            "increment": rng.choice([None, 0.0, 1.25, 2.5, 5.0]),
+            "category": rng.choice(["compound", "accessory"]),
+            "sets": sets,
+            "reps": reps or None,
+        })
+    return rows
+
+def bench_progression(args):
+    import math
+    import numpy as np
+    from logic import amrap_reps, compute_new_load, compute_new_loads, reps_matrix
+
+    rows = random_progression_rows(args.rows, seed=0)
+    cols = [[r[k] for r in rows] for k in ["load_last", "rep_high", "increment", "category", "sets", "reps"]]
+
+    t = time.perf_counter()
+    want = [compute_new_load(dict(r, amrap=amrap_reps(r["reps"], r["sets"])
+                                  if r["category"] == "accessory" else None)) for r in rows]
+    t_scalar = time.perf_counter() - t
+    t = time.perf_counter()
+    got = compute_new_loads(*cols).tolist()
+    t_batch = time.perf_counter() - t
+
+    # the same columns already held as arrays (e.g. loaded straight from a query)
+    packed = [np.array([np.nan if x in (None, "") else x for x in cols[0]], dtype=np.float64),
+              np.array(cols[1]), np.array([x or 0.0 for x in cols[2]]), np.array(cols[3]),
+              np.array(cols[4]), reps_matrix(cols[5], width=max(cols[4]))]
+    t = time.perf_counter()
+    compute_new_loads(*packed)
+    t_packed = time.perf_counter() - t
+
+    # equivalence is tests/test_progression.py's job; timings of diverging
+    # results would be meaningless, so don't print them
+    assert [None if math.isnan(g) else g for g in got] == want
+
+    print(f"{args.rows} simulated rows")
+    print(f"scalar, one dict per row  {t_scalar * 1000:8.1f} ms")
+    print(f"batch, python lists       {t_batch * 1000:8.1f} ms   ({t_scalar / t_batch:.1f}x)")
+    print(f"batch, packed arrays      {t_packed * 1000:8.1f} ms   ({t_scalar / t_packed:.1f}x)")
+
+# ------------ load: gunicorn worker/pool configurations ------------
+# Extends the repo's gunicorn.conf.py; optionally adds a fixed delay to every
+# SQL statement to stand in for the round trip to a remote Postgres
+_LOAD_CONF = r"""
+exec(open({conf!r}).read())
+_base_post_fork = post_fork
+
+def post_fork(server, worker):
+    _base_post_fork(server, worker)
+    delay = {delay!r}
+    if delay:
+        import time
+        from sqlalchemy import event
+        import app
+        event.listen(app.engine, "before_cursor_execute", lambda *a: time.sleep(delay))
+"""
+
+def _free_port() -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _wait_ready(base: str, proc, timeout: float = 30.0):
+    import urllib.request
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {proc.returncode}")
+        try:
+            urllib.request.urlopen(base + "/healthz", timeout=2).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("gunicorn did not become ready")
+
+def _drive(base: str, routes: list, clients: int, duration: float):
+    # `clients` threads issue GETs round-robin over `routes` for `duration`
+    # seconds; returns (latencies in ms, error count)
+    import threading
+    import urllib.request
+    lat, errors = [], [0]
+    lock = threading.Lock()
+    stop = time.perf_counter() + duration
+
+    def client(offset):
+        i = offset
+        mine, failed = [], 0
+        while time.perf_counter() < stop:
+            t = time.perf_counter()
+            try:
+                urllib.request.urlopen(base + routes[i % len(routes)], timeout=30).read()
+                mine.append((time.perf_counter() - t) * 1000)
+            except OSError:
+                failed += 1
+            i += 1
+        with lock:
+            lat.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return sorted(lat), errors[0]
+
+def bench_load(args):
+    url = os.environ.get("DATABASE_URL") or temp_db_url()
+    os.environ["DATABASE_URL"] = url
+    from sqlalchemy import create_engine
+    import schema
+    engine = create_engine(url, future=True)
+    schema.bootstrap(engine, force=True)
+    seed_log(engine, args.weeks)
+    engine.dispose()
+
+    conf_path = os.path.join(tempfile.mkdtemp(prefix="ht-load-"), "gunicorn.conf.py")
+    with open(conf_path, "w") as f:
+        f.write(_LOAD_CONF.format(conf=os.path.join(HERE, "gunicorn.conf.py"),
+                                  delay=args.db_latency_ms / 1000.0))
+
+    print(f"{args.clients} clients x {args.duration:.0f}s over {' '.join(args.routes)}; "
+          f"+{args.db_latency_ms} ms per SQL statement; db {url.split(':')[0]}")
+    print(f"{'config':>16} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for spec in args.configs:
+        worker_class, workers, threads = spec.split(":")
+        port = _free_port()
+        env = dict(os.environ, PORT=str(port), WEB_CONCURRENCY=workers, GUNICORN_WORKER_CLASS=worker_class,
+                   GUNICORN_THREADS=threads, DB_POOL_SIZE=threads, LOG_LEVEL="WARNING")
+        env.pop("PASSWORD", None)
+        env.pop("MULTI_USER", None)
+        proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", conf_path, "app:app"],
+                                cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        base = f"http://127.0.0.1:{port}"
+        try:
+            _wait_ready(base, proc)
+            _drive(base, args.routes, args.clients, 1.0)  # warm every worker
+            lat, errors = _drive(base, args.routes, args.clients, args.duration)
+        finally:
+            proc.terminate()
+            proc.wait()
+        rps = len(lat) / args.duration
+        p50 = pct(lat, 0.5) if lat else float("nan")
+        p99 = pct(lat, 0.99) if lat else float("nan")
+        print(f"{spec:>16} {rps:8.1f} {p50:8.1f} {p99:8.1f} {errors:7d}")
+
+# ------------ reads: sync vs. asyncio history reads ------------
+class _DelayedSession:
+    # Session wrapper adding a fixed wait before each query, standing in for
+    # the round trip to a remote database (SQLite answers instantly)
+    def __init__(self, s, delay):
+        self.s, self.delay = s, delay
+
+    def scalars(self, stmt):
+        time.sleep(self.delay)
+        return self.s.scalars(stmt)
+
+    def execute(self, stmt):
+        time.sleep(self.delay)
+        return self.s.execute(stmt)
+
+    def scalar(self, stmt):
+        time.sleep(self.delay)
+        return self.s.scalar(stmt)
+
+class _DelayedAsyncSession(_DelayedSession):
+    async def scalars(self, stmt):
+        import asyncio
+        await asyncio.sleep(self.delay)
+        return await self.s.scalars(stmt)
+
+    async def execute(self, stmt):
+        import asyncio
+        await asyncio.sleep(self.delay)
+        return await self.s.execute(stmt)
+
+    async def scalar(self, stmt):
+        import asyncio
+        await asyncio.sleep(self.delay)
+        return await self.s.scalar(stmt)
+
+def _seed_sessions(engine, user_id: int, weeks: int) -> list:
+    # One WorkoutSession (and its day summary) per logged day, on consecutive
+    # dates; returns the dates
+    from datetime import date, timedelta
+    from sqlalchemy import insert
+    from logic import DAYS
+    from models import WorkoutSession
+    import summaries
+    rows, day0 = [], date(2025, 1, 1)
+    for week in range(1, weeks + 1):
+        for day in range(1, len(DAYS) + 1):
+            rows.append(dict(user_id=user_id, week=week, day=day,
+                             session_date=day0 + timedelta(days=len(rows)), duration_seconds=3600))
+    with engine.begin() as conn:
+        conn.execute(insert(WorkoutSession), rows)
+        summaries.refresh(conn, user_id, [r["session_date"] for r in rows])
+    return [r["session_date"] for r in rows]
+
+def bench_reads(args):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    import config
+    import reads
+    import schema
+
+    url = os.environ.get("DATABASE_URL") or temp_db_url()
+    if not reads.async_available(url):
+        raise SystemExit("asyncio path unavailable: needs greenlet, asgiref and "
+                         "aiosqlite (SQLite) or asyncpg (Postgres)")
+    engine = create_engine(url, **config.engine_options(url))
+    schema.bootstrap(engine, force=True)
+    uid = schema.default_user_id()
+    seed_log(engine, args.weeks)
+    dates = _seed_sessions(engine, uid, args.weeks)
+    delay = args.db_latency_ms / 1000.0
+
+    def targets(n):
+        return [dates[i % len(dates)] for i in range(n)]
+
+    def sync_request(day):
+        with Session(engine) as s:
+            found = reads.history_day(_DelayedSession(s, delay), uid, day)
+            reads.history_month(_DelayedSession(s, delay), uid, day.year, day.month)
+            return found
+
+    def run_sync(threads):
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            t = time.perf_counter()
+            results = list(pool.map(sync_request, targets(args.requests)))
+            return time.perf_counter() - t, results
+
+    async def run_async(concurrency):
+        from sqlalchemy.ext.asyncio import AsyncSession
+        aengine = reads.async_engine(url, pooled=True)
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(day):
+            async with gate, AsyncSession(aengine) as s:
+                found = await reads.history_day_async(_DelayedAsyncSession(s, delay), uid, day)
+                await reads.history_month_async(_DelayedAsyncSession(s, delay), uid, day.year, day.month)
+                return found
+
+        await asyncio.gather(*[one(d) for d in targets(min(args.requests, 20))])  # warm the pool
+        t = time.perf_counter()
+        results = await asyncio.gather(*[one(d) for d in targets(args.requests)])
+        elapsed = time.perf_counter() - t
+        await aengine.dispose()
+        return elapsed, results
+
+    print(f"{args.requests} history requests (day + month view, 3 queries each), "
+          f"+{args.db_latency_ms} ms per query; db {url.split(':')[0]}")
+    print(f"{'path':>28} {'req/s':>9}")
+    run_sync(2)  # warm-up
+    for threads in args.threads:
+        elapsed, results = run_sync(threads)
+        assert all(results)
+        print(f"{f'sync, {threads} threads':>28} {args.requests / elapsed:9.1f}")
+    for concurrency in args.concurrency:
+        elapsed, results = asyncio.run(run_async(concurrency))
+        assert all(results)
+        print(f"{f'asyncio, {concurrency} in flight':>28} {args.requests / elapsed:9.1f}")
+
+# ------------ rows: ORM entities vs. column projections ------------
+def bench_rows(args):
+    from flask import g, render_template
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+    from models import Log
+    import blocks
+    import reads
+    import schema
+    import units
+
+    app = fresh_app()
+    n = seed_log(app.engine, args.weeks)
+    uid = schema.default_user_id()
+    weeks = range(1, args.weeks + 1)
+
+    def entity_rows(s, week):
+        # what the GET pages used to load: tracked Log entities
+        return s.scalars(select(Log).where(Log.user_id == uid, Log.week == week)
+                         .order_by(Log.day, Log.id)).all()
+
+    def column_rows(s, week):
+        return reads.week_rows(s, uid, week)
+
+    def render_week(week, views):
+        grouped = []
+        for day_idx in range(1, 8):
+            sub = [r for r in views if r.day == day_idx]
+            grouped.append((sub[0].day_title if sub else f"Day {day_idx}", sub))
+        with app.app.test_request_context(f"/week/{week}"):
+            g.user_id = uid
+            return render_template("week.html", week=week, abs_week=week, block=block,
+                                   prev_url=None, next_url=None, grouped=grouped, bw=80.0, units="lb")
+
+    block = blocks.BlockView(1, 1, args.weeks)  # one block spanning the whole history
+    paths = [("orm entities", entity_rows), ("column rows", column_rows)]
+    for _, load in paths:  # warm-up: templates, statement caches
+        with Session(app.engine) as s:
+            render_week(1, units.log_views(load(s, 1), "lb"))
+
+    def one_pass(load):
+        load_t = render_t = 0.0
+        with Session(app.engine) as s:
+            for week in weeks:
+                t = time.perf_counter()
+                views = units.log_views(load(s, week), "lb")
+                t2 = time.perf_counter()
+                render_week(week, views)
+                load_t += t2 - t
+                render_t += time.perf_counter() - t2
+        return load_t, render_t
+
+    # passes interleaved so drift (GC, CPU frequency) hits both paths alike; medians reported
+    timings = {name: [] for name, _ in paths}
+    for _ in range(args.reps):
+        for name, load in paths:
+            timings[name].append(one_pass(load))
+
+    print(f"{n} log rows over {args.weeks} weeks; one pass loads + renders every week page")
+    print(f"{'path':>14} {'load ms':>9} {'render ms':>10} {'peak MB (all weeks held)':>26}")
+    for name, load in paths:
+        load_ms = statistics.median(l for l, _ in timings[name]) * 1000
+        render_ms = statistics.median(r for _, r in timings[name]) * 1000
+
+        # memory of the whole history loaded into one session, as a long
+        # request (or a worker handling many) would hold it
+        tracemalloc.start()
+        with Session(app.engine) as s:
+            held = [load(s, week) for week in weeks]
+            _, peak = tracemalloc.get_traced_memory()
+            del held
+        tracemalloc.stop()
+        print(f"{name:>14} {load_ms:9.1f} {render_ms:10.1f} {peak / 2**20:26.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("startup", help="import time and RSS of a cold worker")
+    p.add_argument("--runs", type=int, default=5)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("export", help="peak memory of the streaming exports")
+    p.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    p.set_defaults(func=bench_export)
+
+    p = sub.add_parser("users", help="week/dashboard latency as the number of athletes grows")
+    p.add_argument("--users", type=int, nargs="+", default=[10, 100, 1000, 3000])
+    p.add_argument("--weeks", type=int, default=4)
+    p.add_argument("--reps", type=int, default=30)
+    p.set_defaults(func=bench_users)
+
+    p = sub.add_parser("progression", help="batch vs. per-row progression timings")
+    p.add_argument("--rows", type=int, default=100000)
+    p.set_defaults(func=bench_progression)
+
+    p = sub.add_parser("load", help="throughput and p99 per gunicorn worker/pool configuration")
+    p.add_argument("--configs", nargs="+", default=["sync:2:1", "gthread:2:4", "gthread:1:8"],
+                   help="WORKER_CLASS:WORKERS:THREADS (pool size follows threads)")
+    p.add_argument("--routes", nargs="+", default=["/week/2", "/api/dashboard/series", "/history", "/rm-test"])
+    p.add_argument("--clients", type=int, default=16)
+    p.add_argument("--duration", type=float, default=10.0)
+    p.add_argument("--weeks", type=int, default=12)
+    p.add_argument("--db-latency-ms", type=float, default=5.0,
+                   help="delay added to each SQL statement to mimic a remote database")
+    p.set_defaults(func=bench_load)
+
+    p = sub.add_parser("reads", help="history reads: thread pool + sync engine vs. asyncio engine")
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    p.add_argument("--concurrency", type=int, nargs="+", default=[8, 64])
+    p.add_argument("--weeks", type=int, default=12)
+    p.add_argument("--db-latency-ms", type=float, default=5.0,
+                   help="wait added before each query to mimic a remote database")
+    p.set_defaults(func=bench_reads)
+
+    p = sub.add_parser("rows", help="week page: ORM entities vs. column projections")
+    p.add_argument("--weeks", type=int, default=52)
+    p.add_argument("--reps", type=int, default=5)
+    p.set_defaults(func=bench_rows)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Training blocks.
+
+A block is a run of consecutive weeks, started from the settings page.
+Log, Progress, WorkoutSession, PRHistory and the other week-keyed tables
+keep one absolute week number per user: with 12-week blocks, week 13 is
+week 1 of block 2. Their keys and indexes are unchanged. Blocks only map
+that number to the "block B, week W" that pages and URLs show.
+
+A user without a block row gets block 1 (weeks 1..BLOCK_WEEKS) on first
+use. That block is the old fixed 12-week program, so existing data needs
+no migration.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+
+import config
+from models import Log, Progress, TrainingBlock, WeekSync, WorkoutSession
+
+@dataclass(frozen=True, slots=True)
+class BlockView:
+    number: int
+    start_week: int
+    weeks: int
+
+    @property
+    def end_week(self) -> int:
+        return self.start_week + self.weeks - 1
+
+    def absolute(self, week: int) -> int:
+        # absolute week number of this block's week `week` (1-based)
+        return self.start_week + week - 1
+
+def load(s: Session, user_id: int) -> tuple:
+    """The user's blocks in order, creating block 1 on first use."""
+    rows = s.execute(
+        select(TrainingBlock.number, TrainingBlock.start_week, TrainingBlock.weeks)
+        .where(TrainingBlock.user_id == user_id)
+        .order_by(TrainingBlock.number)
+    ).all()
+    if not rows:
+        s.add(TrainingBlock(user_id=user_id, number=1, start_week=1, weeks=config.BLOCK_WEEKS))
+        s.commit()
+        return (BlockView(1, 1, config.BLOCK_WEEKS),)
+    return tuple(BlockView(*r) for r in rows)
+
+def find(blocks: tuple, number: int) -> BlockView | None:
+    return next((b for b in blocks if b.number == number), None)
+
+def locate(blocks: tuple, abs_week: int):
+    # (block, week within it) for an absolute week, or None outside every block
+    for b in blocks:
+        if b.start_week <= abs_week <= b.end_week:
+            return b, abs_week - b.start_week + 1
+    return None
+
+def label(blocks: tuple, abs_week: int) -> str:
+    found = locate(blocks, abs_week)
+    return f"B{found[0].number} W{found[1]}" if found else f"W{abs_week}"
+
+def window_start(blocks: tuple, last_week: int, weeks: int | None = None) -> int:
+    """
+    First absolute week of the history window: the last `weeks` weeks
+    (default HISTORY_WEEKS) up to last_week, the latest logged week (see
+    last_logged()), or up to the current block's first week while nothing has
+    been logged in it; 1 when the window is 0 (everything).
+    """
+    weeks = config.HISTORY_WEEKS if weeks is None else weeks
+    anchor = max(last_week, blocks[-1].start_week)
+    return max(1, anchor - weeks + 1) if weeks > 0 else 1
+
+def last_logged(s: Session, user_id: int, lo: int = 1, hi: int | None = None) -> int:
+    # Last week in lo..hi with anything the athlete entered (a session, a
+    # bodyweight, or a Log row with reps or a computed new load); 0 if none.
+    # Log rows alone don't count: visiting a week or RM-test seeding creates them.
+    def last(model, *where):
+        stmt = select(model.week).where(model.user_id == user_id, model.week >= lo, *where)
+        if hi is not None:
+            stmt = stmt.where(model.week <= hi)
+        return s.scalar(stmt.order_by(model.week.desc()).limit(1)) or 0
+    return max(last(WorkoutSession), last(Progress),
+               last(Log, or_(Log.reps.is_not(None), Log.new_load.is_not(None))))
+
+def start_next(s: Session, user_id: int, weeks: int) -> BlockView:
+    """
+    Start a new block of `weeks` weeks after the current one; not committed.
+    A current block left early is cut after the last week with anything
+    logged (keeping at least its first week), so the new block follows on
+    directly instead of after weeks that were never trained. The weeks it
+    takes over lose their untouched Log rows (seeded for the old block's week
+    numbers), so the new block's pages recreate and reseed them.
+    """
+    current = s.scalars(
+        select(TrainingBlock).where(TrainingBlock.user_id == user_id)
+        .order_by(TrainingBlock.number.desc()).limit(1)
+    ).first()
+    if current is None:
+        load(s, user_id)
+        return start_next(s, user_id, weeks)
+
+    end = current.start_week + current.weeks - 1
+    cut = max(current.start_week, last_logged(s, user_id, current.start_week, end))
+    current.weeks = cut - current.start_week + 1
+    if cut < end:
+        for model in (Log, WeekSync):
+            s.execute(delete(model).where(model.user_id == user_id,
+                                          model.week.between(cut + 1, end)))
+
+    nxt = TrainingBlock(user_id=user_id, number=current.number + 1, start_week=cut + 1, weeks=weeks)
+    s.add(nxt)
+    return BlockView(nxt.number, nxt.start_week, nxt.weeks)
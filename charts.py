@@ -0,0 +1,162 @@
+"""
+Dashboard chart rendering with a per-process cache.
+
+Entries are keyed on (user, State.data_version, units) and hold the charted
+series plus each PNG rendered so far. The dashboard page only needs the
+series (which lifts have data); every chart is drawn on its own first
+request to /dashboard/chart/<name>.png, so a worker never renders charts
+nobody asked it for. Writes that change logged loads or bodyweight (week
+save, RM test save) or the charted window of weeks (starting a training
+block) bump State.data_version, so every worker notices the change on its
+next dashboard view; until then repeat views serve the stored PNG bytes
+without touching matplotlib.
+"""
+import hashlib
+import io
+import re
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import blocks
+import config
+import metrics
+import units
+from logic import DASHBOARD_LIFTS
+from models import State, Log, Progress
+
+# Roughly one entry per recently active athlete
+_CACHE_SIZE = 64
+_cache = OrderedDict()  # (user_id, data_version, units) -> {"series": load_series(), "pngs": {name: png}}
+_lock = threading.Lock()
+
+# Bump when the rendering code or the series format changes, so browsers holding
+# an old chart or series under a still-current data_version refetch it
+CHART_VERSION = 1
+
+def _pyplot():
+    # matplotlib is only needed here; importing it lazily keeps it (and
+    # openpyxl, see export.py) out of every worker's cold start
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+def bump_data_version(st: State):
+    # Call from any write that changes charted data; committed with the caller's session
+    st.data_version = (st.data_version or 0) + 1
+    invalidate(st.user_id)
+
+def invalidate(user_id: int):
+    with _lock:
+        for key in [k for k in _cache if k[0] == user_id]:
+            del _cache[key]
+
+def _png(plt, fig) -> bytes:
+    bio = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(bio, format="png", dpi=110)
+    plt.close(fig)
+    return bio.getvalue()
+
+def load_series(s: Session, st: State) -> dict:
+    """
+    Week-indexed series in display units, shared by the PNG renderer and the
+    client-side dashboard: {"units", "bodyweight": [[week, value], ...],
+    "lifts": {name: [[week, value], ...]}}. Lifts with no rows are omitted.
+    """
+    # the last HISTORY_WEEKS weeks only, however long the log has grown
+    lo = blocks.window_start(st.blocks, blocks.last_logged(s, st.user_id)) if st.blocks else 1
+    progs = s.execute(
+        select(Progress.week, Progress.bodyweight)
+        .where(Progress.user_id == st.user_id, Progress.week >= lo)
+        .order_by(Progress.week)
+    ).all()
+    bw_values = units.display_many([bw for _, bw in progs], st.units, 1)
+    bodyweight = [[w, v] for (w, _), v in zip(progs, bw_values)]
+
+    # every lift in one round trip, split per exercise in memory
+    rows = s.execute(
+        select(Log.exercise, Log.week, Log.new_load, Log.load_last)
+        .where(Log.user_id == st.user_id, Log.exercise.in_(DASHBOARD_LIFTS), Log.week >= lo)
+        .order_by(Log.exercise, Log.week)
+    ).all()
+    values = units.display_many([nl if nl is not None else ll for _, _, nl, ll in rows], st.units, 1)
+    by_lift = {}
+    for (ex, w, _, _), v in zip(rows, values):
+        by_lift.setdefault(ex, []).append([w, v])
+    lifts = {lift: by_lift[lift] for lift in DASHBOARD_LIFTS if lift in by_lift}
+
+    return {"units": st.units, "bodyweight": bodyweight, "lifts": lifts}
+
+def render_chart(series: dict, name: str) -> bytes | None:
+    # One chart from load_series() output: "bodyweight" or a lift slug; None
+    # for an unknown lift or one with no data
+    if name == "bodyweight":
+        points, ylabel = series["bodyweight"], "Body Weight"
+    else:
+        lift = LIFTS_BY_SLUG.get(name)
+        points, ylabel = series["lifts"].get(lift), lift
+        if not points:
+            return None
+
+    # timed as its own Server-Timing / metrics phase, apart from the SQL
+    with metrics.timed("matplotlib"):
+        plt = _pyplot()
+        fig, ax = plt.subplots(figsize=(7,3))
+        if points:
+            ax.plot([w for (w, _) in points], [v for (_, v) in points])
+            ax.set_ylabel(f"{ylabel} ({series['units']})")
+        ax.set_xlabel("Week"); ax.grid(True, alpha=0.3)
+        return _png(plt, fig)
+
+def chart_slug(lift: str) -> str:
+    # URL-safe chart name, e.g. "Overhead Press (Barbell/DB)" -> "overhead-press-barbell-db"
+    return re.sub(r"[^a-z0-9]+", "-", lift.lower()).strip("-")
+
+LIFTS_BY_SLUG = {chart_slug(lift): lift for lift in DASHBOARD_LIFTS}
+
+def chart_etag(st: State, name: str) -> str:
+    # A chart's bytes follow from (user, data version, units, name) plus the render
+    # configuration (CHART_VERSION, the charted window and lifts), so the ETag can
+    # be computed without rendering and 304s never touch matplotlib
+    key = (f"{st.user_id}:{st.data_version or 0}:{st.units}:{name}:"
+           f"{CHART_VERSION}:{config.HISTORY_WEEKS}:{'|'.join(DASHBOARD_LIFTS)}")
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def _entry(s: Session, st: State) -> dict:
+    # This data version's cache entry, loading its series on a miss
+    key = (st.user_id, st.data_version or 0, st.units)
+    with _lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            return hit
+
+    entry = {"series": load_series(s, st), "pngs": {}}
+
+    with _lock:
+        entry = _cache.setdefault(key, entry)
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return entry
+
+def get_series(s: Session, st: State) -> dict:
+    """load_series() for the current data version, cached alongside the PNGs."""
+    return _entry(s, st)["series"]
+
+def get_chart_png(s: Session, st: State, name: str) -> bytes | None:
+    # name is "bodyweight" or a lift slug; None if unknown or no data logged.
+    # Only this chart is rendered on a miss.
+    entry = _entry(s, st)
+    with _lock:
+        png = entry["pngs"].get(name)
+    if png is None:
+        png = render_chart(entry["series"], name)
+        if png is not None:
+            with _lock:
+                entry["pngs"][name] = png
+    return png
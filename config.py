@@ -0,0 +1,78 @@
+"""
+Deployment tuning read from the environment.
+
+Defaults target a 512 MB instance (Render free plan) talking to a remote
+Postgres: two gunicorn workers with a few threads each, so a slow database
+round trip blocks one thread instead of a whole worker, and one pooled
+connection per thread so threads never queue for a connection. Every pool
+lives inside a worker, so the database sees up to
+WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+
+    WEB_CONCURRENCY        gunicorn workers                  2
+    GUNICORN_WORKER_CLASS  sync | gthread                    gthread
+    GUNICORN_THREADS       threads per worker (gthread)      4
+    GUNICORN_TIMEOUT       seconds before a stuck worker     30
+                           is restarted
+    GUNICORN_MAX_REQUESTS  recycle a worker after N          1000
+                           requests (0 = never); bounds
+                           slow memory growth
+    DB_POOL_SIZE           persistent connections/worker     GUNICORN_THREADS
+    DB_MAX_OVERFLOW        extra short-lived connections     2
+    DB_POOL_TIMEOUT        seconds to wait for a connection  10
+    DB_POOL_RECYCLE        reconnect connections older than  1800
+    DB_CONNECT_TIMEOUT     seconds to open a connection      10
+    DB_STATEMENT_TIMEOUT   server-side statement limit, ms   0 (none)
+                           (Postgres; sent as a startup
+                           option, which some poolers reject)
+    BLOCK_WEEKS            default training block length     12
+    HISTORY_WEEKS          weeks shown by the dashboard      52
+                           charts and 1RM history, counted
+                           back from the latest logged week
+                           (0 = everything)
+    STATE_CACHE            cache State rows per worker       1
+                           (0 = off; needed when several
+                           instances share the database, see
+                           state_cache.py)
+"""
+import os
+
+def _int(name: str, default: int) -> int:
+    value = os.environ.get(name, "")
+    return int(value) if value.strip() else default
+
+# ------------ gunicorn ------------
+WORKERS = _int("WEB_CONCURRENCY", 2)
+WORKER_CLASS = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+THREADS = _int("GUNICORN_THREADS", 4) if WORKER_CLASS == "gthread" else 1
+TIMEOUT = _int("GUNICORN_TIMEOUT", 30)
+MAX_REQUESTS = _int("GUNICORN_MAX_REQUESTS", 1000)
+
+# ------------ SQLAlchemy pool (per worker) ------------
+POOL_SIZE = _int("DB_POOL_SIZE", THREADS)
+MAX_OVERFLOW = _int("DB_MAX_OVERFLOW", 2)
+POOL_TIMEOUT = _int("DB_POOL_TIMEOUT", 10)
+POOL_RECYCLE = _int("DB_POOL_RECYCLE", 1800)
+CONNECT_TIMEOUT = _int("DB_CONNECT_TIMEOUT", 10)
+STATEMENT_TIMEOUT_MS = _int("DB_STATEMENT_TIMEOUT", 0)
+
+# ------------ program ------------
+BLOCK_WEEKS = _int("BLOCK_WEEKS", 12)
+HISTORY_WEEKS = _int("HISTORY_WEEKS", 52)
+
+# ------------ caches ------------
+STATE_CACHE = os.environ.get("STATE_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+def engine_options(url: str) -> dict:
+    """Keyword arguments for create_engine(url)."""
+    opts = {"future": True, "pool_pre_ping": True, "pool_recycle": POOL_RECYCLE}
+    if url.startswith("sqlite"):
+        # SQLite's default pools don't take sizing arguments; local/bench only
+        return opts
+
+    opts.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_timeout=POOL_TIMEOUT)
+    if url.startswith("postgres"):
+        connect_args = {"connect_timeout": CONNECT_TIMEOUT}
+        if STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"
+        opts["connect_args"] = connect_args
+    return opts
@@ -0,0 +1,130 @@
+"""
+Streaming exports of the log and progress tables.
+
+Rows are read in chunks (yield_per, which uses a server-side cursor on
+Postgres) and written straight into the output, so peak memory stays flat
+no matter how long the history gets:
+
+- xlsx: write-only openpyxl workbook spooled to a temp file
+- csv: a generator the route streams to the client as it is produced
+- parquet: optional (needs pyarrow), written one row group per chunk
+
+Every export takes since_week (an absolute week, see blocks.py) to cut the
+history to a window; the default 1 exports everything.
+"""
+import csv
+import io
+import tempfile
+
+from sqlalchemy import Float, Integer, select
+from sqlalchemy.orm import Session
+
+import metrics
+from models import Log, Progress
+
+CHUNK_ROWS = 1000
+
+# Exported columns per table, in sheet order (all stored values are kg;
+# per-set reps are flattened to text such as "8,8,7")
+TABLES = {
+    "log": (Log, ["week", "day", "day_title", "exercise", "sets", "rep_low", "rep_high",
+                  "category", "increment", "load_last", "reps", "amrap",
+                  "new_load", "notes"]),
+    "progress": (Progress, ["week", "bodyweight"]),
+}
+
+# Spool exports in memory up to this size before falling back to a temp file
+_SPOOL_BYTES = 8 * 1024 * 1024
+
+def iter_rows(s: Session, table: str, user_id: int, chunk: int = CHUNK_ROWS, since_week: int = 1):
+    # Yield plain tuples of one user's `table` from since_week on, fetched `chunk` rows at a time
+    model, columns = TABLES[table]
+    stmt = (
+        select(*[getattr(model, c) for c in columns])
+        .where(model.user_id == user_id, model.week >= since_week)
+        .order_by(model.week, model.id)
+        .execution_options(yield_per=chunk)
+    )
+    for row in s.execute(stmt):
+        yield tuple(_flat(v) for v in row)
+
+def _flat(value):
+    if isinstance(value, list):
+        return ",".join("" if x is None else str(x) for x in value)
+    return value
+
+def write_xlsx(s: Session, user_id: int, fileobj, since_week: int = 1):
+    # timed phase includes the interleaved chunk fetches (also counted as SQL)
+    with metrics.timed("xlsx"):
+        from openpyxl import Workbook  # heavy; loaded on first export only
+
+        wb = Workbook(write_only=True)
+        for table, (_, columns) in TABLES.items():
+            ws = wb.create_sheet(table)
+            ws.append(columns)
+            for row in iter_rows(s, table, user_id, since_week=since_week):
+                ws.append(row)
+        wb.save(fileobj)
+
+def xlsx_file(s: Session, user_id: int, since_week: int = 1):
+    # Return a rewound file object holding the workbook
+    out = tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES)
+    write_xlsx(s, user_id, out, since_week)
+    out.seek(0)
+    return out
+
+def iter_csv(engine, table: str, user_id: int, since_week: int = 1):
+    # Generator of CSV text chunks; opens its own session because the
+    # response is consumed after the view function has returned
+    _, columns = TABLES[table]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    with Session(engine) as s:
+        for i, row in enumerate(iter_rows(s, table, user_id, since_week=since_week), start=1):
+            writer.writerow(row)
+            if i % CHUNK_ROWS == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+    yield buf.getvalue()
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _arrow_schema(pa, model, columns):
+    # Explicit schema so an all-NULL first chunk can't pin a column to type null
+    fields = []
+    for c in columns:
+        col_type = model.__table__.c[c].type
+        if isinstance(col_type, Integer):
+            fields.append(pa.field(c, pa.int64()))
+        elif isinstance(col_type, Float):
+            fields.append(pa.field(c, pa.float64()))
+        else:
+            fields.append(pa.field(c, pa.string()))
+    return pa.schema(fields)
+
+def parquet_file(s: Session, table: str, user_id: int, since_week: int = 1):
+    # Columnar export for analytics; one row group per chunk of rows
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    model, columns = TABLES[table]
+    schema = _arrow_schema(pa, model, columns)
+    out = tempfile.SpooledTemporaryFile(max_size=_SPOOL_BYTES)
+    batch = []
+    with metrics.timed("parquet"), pq.ParquetWriter(out, schema) as writer:
+        for row in iter_rows(s, table, user_id, since_week=since_week):
+            batch.append(dict(zip(columns, row)))
+            if len(batch) >= CHUNK_ROWS:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch.clear()
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    out.seek(0)
+    return out
@@ -0,0 +1,24 @@
+# gunicorn settings; values come from config.py (environment variables)
+import os
+
+import config as app_config  # "config" itself is a gunicorn setting name
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = app_config.WORKERS
+worker_class = app_config.WORKER_CLASS
+threads = app_config.THREADS
+timeout = app_config.TIMEOUT
+graceful_timeout = app_config.TIMEOUT
+keepalive = 5
+max_requests = app_config.MAX_REQUESTS
+max_requests_jitter = app_config.MAX_REQUESTS // 10
+
+# Import the app once in the master and fork workers from it: the workers
+# share its memory pages, which matters on a 512 MB instance
+preload_app = True
+
+def post_fork(server, worker):
+    # Connections must not be shared across processes; the pool is empty
+    # unless something connected before the fork, but drop it to be sure
+    import app
+    app.engine.dispose(close=False)
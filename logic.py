@@ -1,4 +1,9 @@
-from typing import List, Tuple
+import hashlib
+from itertools import chain
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 PROGRAM_V1 = [
     ("Day 1 – Push (Chest/Shoulders/Triceps)", [
@@ -50,6 +55,22 @@ PROGRAM_V1 = [
 # Use PROGRAM_V1 for seeding
 DAYS = PROGRAM_V1
 
+# Lifts charted on the dashboard, in display order (exercise names from DAYS)
+DASHBOARD_LIFTS = [
+    "Back Squat",
+    "Flat Barbell Bench Press",
+    "Deadlift",
+    "Overhead Press (Barbell/DB)",
+]
+
+def program_fingerprint(days=None) -> str:
+    # Stable hash of the program definition; any edit to DAYS changes it
+    days = DAYS if days is None else days
+    return hashlib.sha1(repr(days).encode("utf-8")).hexdigest()
+
+# Stored per week by init_week_rows so unchanged weeks skip the metadata sync
+PROGRAM_HASH = program_fingerprint()
+
 # Map compound exercises to their RM keys (for Week 1–2 % seeding)
 COMPOUND_RM_MAP = {
     "Back Squat": "squat",
@@ -82,6 +103,11 @@ def amrap_threshold(high):
     if high >= 20:  return 30
     return 20
 
+def amrap_reps(reps, sets):
+    # Accessories treat the last programmed set as AMRAP
+    reps = reps or []
+    return reps[sets - 1] if 0 < sets <= len(reps) else None
+
 def compute_new_load(row: dict):
     load_last = row.get("load_last")
     if load_last in (None, ""):
@@ -89,11 +115,138 @@ def compute_new_load(row: dict):
     load_last = float(load_last)
     high = int(row["rep_high"]); inc = float(row["increment"] or 0.0)
     if row["category"] == "compound":
+        # every programmed set must hit the top of the rep range
         sets = int(row["sets"])
-        s1 = (row.get("s1") or 0); s2 = (row.get("s2") or 0); s3 = (row.get("s3") or 0)
-        ok = (s1 >= high) and (s2 >= high) and (s3 >= high or sets < 3)
+        reps = row.get("reps") or []
+        ok = all(((reps[i] if i < len(reps) else None) or 0) >= high for i in range(sets))
         return round_to_2p5(load_last + inc) if ok else round_to_2p5(load_last)
     else:
         thr = amrap_threshold(high)
         amr = (row.get("amrap") or 0)
         return round_to_2p5(load_last + inc) if amr >= thr else round_to_2p5(load_last)
+
+def _amrap_thresholds(high: "np.ndarray") -> "np.ndarray":
+    # amrap_threshold over an array of rep_high values
+    import numpy as np
+    return np.select(
+        [high <= 8, high == 10, high == 12, high == 15, high >= 20],
+        [12, 15, 20, 25, 30],
+        default=20,
+    )
+
+def compute_new_loads(load_last, rep_high, increment, category, sets, reps) -> "np.ndarray":
+    """
+    Column-wise compute_new_load for many rows at once. Takes equal-length
+    sequences (lists or arrays) with None for missing values; reps is a list
+    of per-set reps lists or an already packed (rows x sets) array. Returns
+    float64 new loads with NaN where load_last is missing, matching the scalar
+    function row for row. Pays off on whole columns, especially packed ones;
+    for a few rows the scalar function is faster.
+    """
+    import numpy as np
+    loads = _float_column(load_last, np.nan)
+    high = np.asarray(rep_high, dtype=np.int64)
+    inc = _float_column(increment, 0.0)
+    n_sets = np.asarray(sets, dtype=np.int64)
+    compound = np.asarray(category) == "compound"
+    n = len(loads)
+
+    width = max(int(n_sets.max(initial=0)), 1)
+    m = reps_matrix(reps, width=width)
+    cols = np.arange(m.shape[1])
+
+    # compounds: every programmed set reaches rep_high (unlogged sets are 0)
+    hit = (m >= high[:, None]) | (cols[None, :] >= n_sets[:, None])
+    ok_compound = hit.all(axis=1)
+
+    # accessories: the last programmed set is the AMRAP set
+    last = n_sets - 1
+    valid = (last >= 0) & (last < m.shape[1])
+    amrap = np.where(valid, m[np.arange(n), np.clip(last, 0, m.shape[1] - 1)], 0)
+    ok_accessory = amrap >= _amrap_thresholds(high)
+
+    ok = np.where(compound, ok_compound, ok_accessory)
+    raw = loads + np.where(ok, inc, 0.0)
+    return np.round(np.round(raw / 2.5) * 2.5, 2)
+
+# ------------ 1RM estimation (Epley) ------------
+def epley_1rm(weight_kg: float, reps: int) -> float:
+
+    #Epley: 1RM ≈ w * (1 + reps/30). Returns kg. Requires reps >= 1 and weight > 0.
+
+    if not weight_kg or weight_kg <= 0 or not reps or reps < 1:
+        return 0.0
+    return weight_kg * (1.0 + reps / 30.0)
+
+# Map exercises to which Settings 1RM they influence
+ESTIMATED_RM_MAP = {
+    # Squat
+    "Back Squat": "squat",
+
+    # Bench (barbell focus; include close-grip as a conservative bench estimator)
+    "Flat Barbell Bench Press": "bench",
+    "Close-Grip Bench Press": "bench",
+
+    # Overhead Press
+    "Overhead Press (Barbell/DB)": "ohp",
+    "Seated DB Overhead Press": "ohp",
+
+    # Deadlift
+    "Deadlift": "deadlift",
+}
+
+def reps_matrix(reps_lists, width: int = 0) -> "np.ndarray":
+    # Pack variable-length per-set reps into a zero-padded (rows x max sets)
+    # int array, at least `width` columns wide; blank sets count as 0 reps.
+    # An already packed 2-D array is only widened.
+    import numpy as np
+    if isinstance(reps_lists, np.ndarray) and reps_lists.ndim == 2:
+        packed = reps_lists.astype(np.int64, copy=False)
+        if packed.shape[1] >= max(width, 1):
+            return packed
+        return np.pad(packed, ((0, 0), (0, max(width, 1) - packed.shape[1])))
+
+    n = len(reps_lists)
+    lengths = np.fromiter((len(r) if r else 0 for r in reps_lists), dtype=np.int64, count=n)
+    # None -> NaN -> 0 while converting in C
+    flat = np.array(list(chain.from_iterable(r for r in reps_lists if r)), dtype=np.float64)
+    flat = np.nan_to_num(flat, nan=0.0).astype(np.int64)
+    out = np.zeros((n, max(width, int(lengths.max(initial=0)), 1)), dtype=np.int64)
+    # row/column of every flattened set
+    row_idx = np.repeat(np.arange(n), lengths)
+    col_idx = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    out[row_idx, col_idx] = flat
+    return out
+
+def _float_column(values, missing: float) -> "np.ndarray":
+    # None (and "" from form fields) become `missing`
+    import numpy as np
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    try:
+        col = np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        col = np.array([None if x == "" else x for x in values], dtype=np.float64)
+    return col if np.isnan(missing) else np.nan_to_num(col, nan=missing)
+
+def epley_best(loads_kg, reps_lists) -> "np.ndarray":
+    # Column-wise epley_1rm per row from its highest-rep set (all sets share
+    # the row's load); 0.0 where the load or every set is missing
+    import numpy as np
+    loads = np.array([x or 0.0 for x in loads_kg], dtype=np.float64)
+    top = reps_matrix(reps_lists).max(axis=1)
+    return np.where((loads > 0) & (top >= 1), loads * (1.0 + top / 30.0), 0.0)
+
+def best_estimated_rms(rows) -> dict:
+    # Best Epley estimate in kg per (rm_key, week) over rows exposing
+    # exercise/week/load_last/reps (ORM rows or column tuples). Scalar: a
+    # save passes one week's few rows, too few for epley_best to pay off
+    best = {}
+    for r in rows:
+        rm_key = ESTIMATED_RM_MAP.get(r.exercise)
+        if rm_key and r.load_last and r.reps:
+            est_kg = epley_1rm(r.load_last, max((x or 0 for x in r.reps), default=0))
+            key = (rm_key, r.week)
+            if est_kg > best.get(key, 0.0):
+                best[key] = est_kg
+    return best
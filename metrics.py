@@ -0,0 +1,144 @@
+"""
+Per-request timing and SQL instrumentation.
+
+init_app() hooks every Flask route: wall time, SQL statement count and SQL
+time are collected per request (plus named phases such as matplotlib
+rendering or xlsx writing, see timed()), returned to the browser as a
+Server-Timing header and aggregated per endpoint for the Prometheus text
+served at /metrics. Aggregates are per process; with several gunicorn
+workers each scrape sees the worker that answered it (the pid label tells
+them apart).
+"""
+import hmac
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Histogram buckets for request wall time, seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_requests = {}  # endpoint -> {"count", "wall", "sql_count", "sql_time", "buckets": [..]}
+_phases = {}    # (endpoint, phase) -> {"count", "time"}
+
+@contextmanager
+def timed(phase: str):
+    # Attribute the enclosed time to `phase` of the current request (no-op
+    # outside a request, e.g. in CLI commands and benchmarks)
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        if has_request_context() and "metrics_phases" in g:
+            phases = g.metrics_phases
+            phases[phase] = phases.get(phase, 0.0) + time.perf_counter() - t
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_query_start"] = time.perf_counter()
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("metrics_query_start", None)
+    if started is not None and has_request_context() and "metrics_start" in g:
+        g.metrics_sql_count += 1
+        g.metrics_sql_time += time.perf_counter() - started
+
+def _start():
+    g.metrics_start = time.perf_counter()
+    g.metrics_sql_count = 0
+    g.metrics_sql_time = 0.0
+    g.metrics_phases = {}
+
+def _finish(resp):
+    if "metrics_start" not in g:
+        return resp
+    wall = time.perf_counter() - g.metrics_start
+    endpoint = request.endpoint or "unmatched"
+
+    timings = [f"app;dur={wall * 1000:.1f}",
+               f'sql;dur={g.metrics_sql_time * 1000:.1f};desc="{g.metrics_sql_count} queries"']
+    timings += [f"{name};dur={secs * 1000:.1f}" for name, secs in g.metrics_phases.items()]
+    resp.headers["Server-Timing"] = ", ".join(timings)
+
+    with _lock:
+        agg = _requests.get(endpoint)
+        if agg is None:
+            agg = _requests[endpoint] = {"count": 0, "wall": 0.0, "sql_count": 0, "sql_time": 0.0,
+                                         "buckets": [0] * len(BUCKETS)}
+        agg["count"] += 1
+        agg["wall"] += wall
+        agg["sql_count"] += g.metrics_sql_count
+        agg["sql_time"] += g.metrics_sql_time
+        for i, le in enumerate(BUCKETS):
+            if wall <= le:
+                agg["buckets"][i] += 1
+        for name, secs in g.metrics_phases.items():
+            ph = _phases.setdefault((endpoint, name), {"count": 0, "time": 0.0})
+            ph["count"] += 1
+            ph["time"] += secs
+    return resp
+
+def render() -> str:
+    """Aggregates in the Prometheus text exposition format."""
+    pid = os.getpid()
+    out = [
+        "# HELP http_request_duration_seconds Request wall time per endpoint.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    with _lock:
+        requests = {k: dict(v, buckets=list(v["buckets"])) for k, v in _requests.items()}
+        phases = {k: dict(v) for k, v in _phases.items()}
+
+    for ep, agg in sorted(requests.items()):
+        labels = f'endpoint="{ep}",pid="{pid}"'
+        for le, n in zip(BUCKETS, agg["buckets"]):
+            out.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {n}')
+        out.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {agg["count"]}')
+        out.append(f"http_request_duration_seconds_sum{{{labels}}} {agg['wall']:.6f}")
+        out.append(f"http_request_duration_seconds_count{{{labels}}} {agg['count']}")
+
+    out += ["# HELP sql_statements_total SQL statements executed per endpoint.",
+            "# TYPE sql_statements_total counter"]
+    out += [f'sql_statements_total{{endpoint="{ep}",pid="{pid}"}} {agg["sql_count"]}'
+            for ep, agg in sorted(requests.items())]
+    out += ["# HELP sql_duration_seconds_total Time spent in SQL statements per endpoint.",
+            "# TYPE sql_duration_seconds_total counter"]
+    out += [f'sql_duration_seconds_total{{endpoint="{ep}",pid="{pid}"}} {agg["sql_time"]:.6f}'
+            for ep, agg in sorted(requests.items())]
+
+    out += ["# HELP phase_duration_seconds_total Time spent in named phases (matplotlib, xlsx) per endpoint.",
+            "# TYPE phase_duration_seconds_total counter"]
+    out += [f'phase_duration_seconds_total{{endpoint="{ep}",phase="{ph}",pid="{pid}"}} {v["time"]:.6f}'
+            for (ep, ph), v in sorted(phases.items())]
+    out += ["# HELP phase_calls_total Requests that entered each named phase.",
+            "# TYPE phase_calls_total counter"]
+    out += [f'phase_calls_total{{endpoint="{ep}",phase="{ph}",pid="{pid}"}} {v["count"]}'
+            for (ep, ph), v in sorted(phases.items())]
+    return "\n".join(out) + "\n"
+
+def reset():
+    with _lock:
+        _requests.clear()
+        _phases.clear()
+
+def authorized() -> bool | None:
+    # /metrics access: None while METRICS_TOKEN is unset (endpoint disabled),
+    # else whether the request carries "Authorization: Bearer <token>"
+    token = os.environ.get("METRICS_TOKEN")
+    if not token:
+        return None
+    return hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+
+def instrument(engine):
+    # Count SQL sent through `engine` (a sync Engine, or AsyncEngine.sync_engine)
+    event.listen(engine, "before_cursor_execute", _before_cursor)
+    event.listen(engine, "after_cursor_execute", _after_cursor)
+
+def init_app(app, engine):
+    # Instrument every route of `app` and the SQL sent through `engine`
+    instrument(engine)
+    app.before_request(_start)
+    app.after_request(_finish)
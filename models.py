@@ -1,13 +1,26 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Integer, Float, Text, JSON, UniqueConstraint, Date, TIMESTAMP, BigInteger, DateTime, Column
+from sqlalchemy import String, Integer, Float, Text, JSON, Date, TIMESTAMP, BigInteger, DateTime, Column, ForeignKey, Index
 from datetime import datetime, timezone
 
 class Base(DeclarativeBase):
     pass
 
+class User(Base):
+    __tablename__ = "users"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    username: Mapped[str] = mapped_column(String(80), unique=True)
+
+    # werkzeug.security hash; NULL for the default account (shared PASSWORD login)
+    password_hash: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc)
+    )
+
 class State(Base):
     __tablename__ = "state"
     id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     units = Column(String, default="kg")
 
@@ -17,13 +30,19 @@ class State(Base):
     deadlift = Column(Float, nullable=True)
     ohp = Column(Float, nullable=True)
 
+    # Bumped by writes that change charted data (see charts.bump_data_version)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (Index("uq_state_user", "user_id", unique=True),)
+
 class Log(Base):
     __tablename__ = "log"
     id: Mapped[int] = mapped_column(primary_key=True)
-    week: Mapped[int] = mapped_column(Integer, index=True)
-    day: Mapped[int] = mapped_column(Integer, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    week: Mapped[int] = mapped_column(Integer)
+    day: Mapped[int] = mapped_column(Integer)
     day_title: Mapped[str] = mapped_column(String(100))
-    exercise: Mapped[str] = mapped_column(String(80), index=True)
+    exercise: Mapped[str] = mapped_column(String(80))
     sets: Mapped[int] = mapped_column(Integer)
     rep_low: Mapped[int] = mapped_column(Integer)
     rep_high: Mapped[int] = mapped_column(Integer)
@@ -31,24 +50,33 @@ class Log(Base):
     increment: Mapped[float] = mapped_column(Float)
 
     load_last: Mapped[float | None] = mapped_column(Float, nullable=True)
-    s1: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    s2: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    s3: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Reps per set in set order, e.g. [8, 8, 7]; None entries are sets left blank
+    reps: Mapped[list | None] = mapped_column(JSON(none_as_null=True), nullable=True)
     amrap: Mapped[int | None] = mapped_column(Integer, nullable=True)
     new_load: Mapped[float | None] = mapped_column(Float, nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    __table_args__ = (UniqueConstraint("week","day","exercise", name="uq_week_day_exercise"),)
+    __table_args__ = (
+        Index("uq_log_user_week_day_exercise", "user_id", "week", "day", "exercise", unique=True),
+        Index("ix_log_user_exercise_week", "user_id", "exercise", "week"),
+        # week page and history: one week (or day) in (day, id) order
+        Index("ix_log_user_week_day_id", "user_id", "week", "day", "id"),
+    )
 
 class Progress(Base):
     __tablename__ = "progress"
     id: Mapped[int] = mapped_column(primary_key=True)
-    week: Mapped[int] = mapped_column(Integer, unique=True, index=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    week: Mapped[int] = mapped_column(Integer)
     bodyweight: Mapped[float] = mapped_column(Float)
 
+    __table_args__ = (Index("uq_progress_user_week", "user_id", "week", unique=True),)
+
 class WorkoutSession(Base):
     __tablename__ = "workout_session"
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    # BIGINT on Postgres; SQLite only autoincrements INTEGER primary keys
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     week: Mapped[int] = mapped_column(Integer, nullable=False)
     day: Mapped[int] = mapped_column(Integer, nullable=False)
     session_date = mapped_column(Date, nullable=False)  # e.g., 2025-09-22 (local date is fine)
@@ -57,10 +85,16 @@ class WorkoutSession(Base):
     duration_seconds: Mapped[int] = mapped_column(Integer, nullable=True)
     notes: Mapped[str] = mapped_column(Text, nullable=True)
 
+    __table_args__ = (
+        Index("ix_workout_session_user_date", "user_id", "session_date"),
+        Index("ix_workout_session_user_week_day", "user_id", "week", "day", "session_date"),
+    )
+
 class PRHistory(Base):
     __tablename__ = "pr_history"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
 
     # 'bench', 'squat', 'deadlift', 'ohp'
     lift_key: Mapped[str] = mapped_column(String(20))
@@ -77,4 +111,78 @@ class PRHistory(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc)
-    )
\ No newline at end of file
+    )
+
+    __table_args__ = (Index("ix_pr_history_user_date_id", "user_id", "session_date", "id"),)
+
+class EstimatedRM(Base):
+    __tablename__ = "estimated_rm"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+
+    # 'bench', 'squat', 'deadlift', 'ohp'
+    lift_key: Mapped[str] = mapped_column(String(20))
+    week: Mapped[int] = mapped_column(Integer)
+
+    # Best Epley estimate in kg from that week's logged sets
+    est_kg: Mapped[float] = mapped_column(Float)
+
+    __table_args__ = (Index("uq_estimated_rm_user_week_lift", "user_id", "week", "lift_key", unique=True),)
+
+class WeekSync(Base):
+    __tablename__ = "week_sync"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    week: Mapped[int] = mapped_column(Integer)
+
+    # logic.PROGRAM_HASH the week's Log rows were last synced against
+    program_hash: Mapped[str] = mapped_column(String(40))
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (Index("uq_week_sync_user_week", "user_id", "week", unique=True),)
+
+class DaySummary(Base):
+    __tablename__ = "day_summary"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    session_date = mapped_column(Date, nullable=False)
+
+    # Precomputed from that date's WorkoutSessions and their Log rows (see summaries.py)
+    sessions: Mapped[int] = mapped_column(Integer)
+    week: Mapped[int] = mapped_column(Integer)   # first session's absolute week/day
+    day: Mapped[int] = mapped_column(Integer)
+    total_sets: Mapped[int] = mapped_column(Integer)
+    volume_kg: Mapped[float] = mapped_column(Float)  # sum of load x reps over logged sets
+    duration_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    __table_args__ = (Index("uq_day_summary_user_date", "user_id", "session_date", unique=True),)
+
+class TrainingBlock(Base):
+    __tablename__ = "training_block"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+
+    # 1, 2, ... per user; block N covers absolute weeks start_week .. start_week + weeks - 1
+    number: Mapped[int] = mapped_column(Integer)
+    start_week: Mapped[int] = mapped_column(Integer)
+    weeks: Mapped[int] = mapped_column(Integer)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (Index("uq_training_block_user_number", "user_id", "number", unique=True),)
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Highest migration applied by schema.bootstrap()
+    version: Mapped[int] = mapped_column(Integer)
+    applied_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc)
+    )
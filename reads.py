@@ -0,0 +1,135 @@
+"""
+Read-only queries behind the week and history pages, in sync and asyncio
+flavours.
+
+Pages that only render Log rows select their columns rather than entities,
+so nothing enters the session's identity map or change tracking; the rows
+go straight into units.LogView.
+
+Both flavours run the same statements. The async ones go through
+SQLAlchemy's asyncio engine so a request waiting on a remote database
+yields its event loop instead of holding a worker thread. The asyncio path
+is optional: it needs greenlet and an async driver for DATABASE_URL
+(asyncpg for Postgres, aiosqlite for SQLite), plus asgiref for Flask's
+async views. Set ASYNC_READS=1 to serve the history routes through it.
+"""
+import os
+import threading
+from dataclasses import fields
+from datetime import date
+from calendar import monthrange
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import metrics
+from models import DaySummary, Log, WorkoutSession
+from units import LogView
+
+# Log columns in LogView field order
+LOG_VIEW_COLUMNS = [getattr(Log, f.name) for f in fields(LogView)]
+
+# ------------ statements ------------
+def month_summary_stmt(user_id: int, y: int, m: int):
+    # the calendar's per-day totals, maintained on save (see summaries.py)
+    return (
+        select(DaySummary.session_date, DaySummary.sessions, DaySummary.week, DaySummary.day,
+               DaySummary.total_sets, DaySummary.volume_kg, DaySummary.duration_seconds)
+        .where(
+            DaySummary.user_id == user_id,
+            DaySummary.session_date >= date(y, m, 1),
+            DaySummary.session_date <= date(y, m, monthrange(y, m)[1]),
+        )
+        .order_by(DaySummary.session_date)
+    )
+
+def day_session_stmt(user_id: int, day: date):
+    return select(
+        WorkoutSession.user_id, WorkoutSession.week, WorkoutSession.day,
+        WorkoutSession.session_date, WorkoutSession.duration_seconds,
+    ).where(
+        WorkoutSession.user_id == user_id, WorkoutSession.session_date == day
+    ).limit(1)
+
+def week_rows_stmt(user_id: int, week: int):
+    return select(*LOG_VIEW_COLUMNS).where(
+        Log.user_id == user_id, Log.week == week
+    ).order_by(Log.day, Log.id)
+
+def session_rows_stmt(sess):
+    return select(*LOG_VIEW_COLUMNS).where(
+        Log.user_id == sess.user_id, Log.week == sess.week, Log.day == sess.day
+    ).order_by(Log.id)
+
+# ------------ sync ------------
+def history_month(s: Session, user_id: int, y: int, m: int) -> list:
+    return s.execute(month_summary_stmt(user_id, y, m)).all()
+
+def week_rows(s: Session, user_id: int, week: int) -> list:
+    return s.execute(week_rows_stmt(user_id, week)).all()
+
+def history_day(s: Session, user_id: int, day: date):
+    # (session, its Log rows) as column rows, or None if nothing was logged
+    # that day; the route supplies units from the cached State
+    sess = s.execute(day_session_stmt(user_id, day)).first()
+    if sess is None:
+        return None
+    return sess, s.execute(session_rows_stmt(sess)).all()
+
+# ------------ asyncio ------------
+async def history_month_async(s, user_id: int, y: int, m: int) -> list:
+    return (await s.execute(month_summary_stmt(user_id, y, m))).all()
+
+async def history_day_async(s, user_id: int, day: date):
+    sess = (await s.execute(day_session_stmt(user_id, day))).first()
+    if sess is None:
+        return None
+    return sess, (await s.execute(session_rows_stmt(sess))).all()
+
+_ASYNC_DRIVERS = {"postgresql": ("postgresql+asyncpg", "asyncpg"),
+                  "postgres": ("postgresql+asyncpg", "asyncpg"),
+                  "sqlite": ("sqlite+aiosqlite", "aiosqlite")}
+
+def _driver(url: str):
+    return _ASYNC_DRIVERS.get(url.partition("://")[0].split("+")[0])
+
+def async_url(url: str) -> str | None:
+    # DATABASE_URL with its async driver, or None for unsupported backends
+    driver = _driver(url)
+    return driver[0] + "://" + url.partition("://")[2] if driver else None
+
+def async_available(url: str) -> bool:
+    driver = _driver(url)
+    if driver is None:
+        return False
+    try:
+        import asgiref  # noqa: F401  (Flask's async views)
+        import greenlet  # noqa: F401
+        __import__(driver[1])
+    except ImportError:
+        return False
+    return True
+
+def async_enabled(url: str) -> bool:
+    return os.environ.get("ASYNC_READS", "").lower() in ("1", "true", "yes") and async_available(url)
+
+_engine_lock = threading.Lock()
+_async_engines = {}
+
+def async_engine(url: str, pooled: bool = False):
+    """
+    Lazily created asyncio engine for `url`. Flask runs every async view in a
+    fresh event loop and driver connections are bound to the loop that opened
+    them, so the default is no pooling; pooled=True suits a single long-lived
+    loop (e.g. the benchmark).
+    """
+    key = (url, pooled)
+    with _engine_lock:
+        eng = _async_engines.get(key)
+        if eng is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            from sqlalchemy.pool import NullPool
+            opts = {} if pooled else {"poolclass": NullPool}
+            eng = _async_engines[key] = create_async_engine(async_url(url), **opts)
+            metrics.instrument(eng.sync_engine)
+        return eng
@@ -0,0 +1,220 @@
+"""
+Schema bootstrap: runs once per process instead of on every request.
+
+bootstrap() checks the connection, creates missing tables, applies pending
+migrations and records the resulting version in the schema_version table.
+After the first successful run request handlers only check an in-process flag.
+"""
+import json
+import re
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import inspect, select, text
+
+import summaries
+from models import Base, SchemaVersion, User
+
+# Owner of all pre-multi-user data, and of requests when login is disabled
+DEFAULT_USERNAME = "default"
+
+def _add_column(conn, table: str, column: str, ddl: str):
+    # ALTER TABLE .. ADD COLUMN, skipped if a previous partial run already added it
+    if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+def _ensure_default_user(conn) -> int:
+    users = User.__table__
+    uid = conn.execute(select(users.c.id).where(users.c.username == DEFAULT_USERNAME)).scalar()
+    if uid is None:
+        uid = conn.execute(users.insert().values(
+            username=DEFAULT_USERNAME, created_at=datetime.now(timezone.utc)
+        )).inserted_primary_key[0]
+    return uid
+
+def _sqlite_rewrite_table(conn, table: str, pattern: str, repl: str):
+    # SQLite can't alter a column or table-level constraint in place: recreate
+    # the table from its stored DDL with `pattern` replaced, copy the rows and
+    # restore indexes. No-op when the DDL doesn't match.
+    create_sql = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :t"), {"t": table}).scalar()
+    new_sql = re.sub(pattern, repl, create_sql)
+    if new_sql == create_sql:
+        return
+    index_sql = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :t AND sql IS NOT NULL"),
+        {"t": table}).scalars().all()
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}__old"))
+    conn.execute(text(new_sql))
+    conn.execute(text(f"INSERT INTO {table} SELECT * FROM {table}__old"))
+    conn.execute(text(f"DROP TABLE {table}__old"))
+    for sql in index_sql:
+        conn.execute(text(sql))
+
+def _sqlite_drop_unique(conn, table: str, name: str):
+    _sqlite_rewrite_table(conn, table, rf",\s*CONSTRAINT {name} UNIQUE \([^)]*\)", "")
+
+def _m2_state_data_version(conn):
+    _add_column(conn, "state", "data_version", "INTEGER NOT NULL DEFAULT 0")
+
+_TENANT_TABLES = ["state", "log", "progress", "workout_session", "pr_history", "estimated_rm", "week_sync"]
+
+def _m3_multi_user(conn):
+    # Scope every table by user: existing rows belong to the default user and
+    # the single-tenant unique keys are replaced by user-led ones
+    uid = _ensure_default_user(conn)
+    sqlite = conn.dialect.name == "sqlite"
+    for table in _TENANT_TABLES:
+        _add_column(conn, table, "user_id", "INTEGER REFERENCES users(id)")
+        conn.execute(text(f"UPDATE {table} SET user_id = :uid WHERE user_id IS NULL"), {"uid": uid})
+        if not sqlite:
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN user_id SET NOT NULL"))
+
+    conn.execute(text("DROP INDEX IF EXISTS ix_progress_week"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_week_sync_week"))
+    for table, name in [("log", "uq_week_day_exercise"), ("estimated_rm", "uq_estimated_rm_lift_week")]:
+        if sqlite:
+            _sqlite_drop_unique(conn, table, name)
+        else:
+            conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}"))
+
+    for ddl in [
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_state_user ON state (user_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_log_user_week_day_exercise ON log (user_id, week, day, exercise)",
+        "CREATE INDEX IF NOT EXISTS ix_log_user_exercise_week ON log (user_id, exercise, week)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_progress_user_week ON progress (user_id, week)",
+        "CREATE INDEX IF NOT EXISTS ix_workout_session_user_date ON workout_session (user_id, session_date)",
+        "CREATE INDEX IF NOT EXISTS ix_pr_history_user_date ON pr_history (user_id, session_date)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_estimated_rm_user_week_lift ON estimated_rm (user_id, week, lift_key)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_week_sync_user_week ON week_sync (user_id, week)",
+    ]:
+        conn.execute(text(ddl))
+
+def _m4_log_reps(conn):
+    # Replace the fixed s1/s2/s3 columns with one packed per-set reps array,
+    # so exercises can log any number of sets
+    _add_column(conn, "log", "reps", "JSON")
+    cols = {c["name"] for c in inspect(conn).get_columns("log")}
+    if not {"s1", "s2", "s3"} <= cols:
+        return
+
+    rows = conn.execute(text(
+        "SELECT id, s1, s2, s3 FROM log WHERE s1 IS NOT NULL OR s2 IS NOT NULL OR s3 IS NOT NULL"
+    )).all()
+    for i in range(0, len(rows), 1000):
+        params = []
+        for rid, *sets in rows[i:i + 1000]:
+            while sets and sets[-1] is None:
+                sets.pop()
+            params.append({"rid": rid, "reps": json.dumps(sets)})
+        conn.execute(text("UPDATE log SET reps = :reps WHERE id = :rid"), params)
+
+    if conn.dialect.name != "sqlite" or conn.dialect.dbapi.sqlite_version_info >= (3, 35):
+        for name in ["s1", "s2", "s3"]:
+            conn.execute(text(f"ALTER TABLE log DROP COLUMN {name}"))
+
+def _m5_query_indexes(conn):
+    # Composite indexes shaped like the hot queries. The single-column log
+    # indexes never led with user_id, so no tenant-scoped query used them.
+    for ddl in [
+        "DROP INDEX IF EXISTS ix_log_week",
+        "DROP INDEX IF EXISTS ix_log_day",
+        "DROP INDEX IF EXISTS ix_log_exercise",
+        "DROP INDEX IF EXISTS ix_pr_history_user_date",
+        "CREATE INDEX IF NOT EXISTS ix_log_user_week_day_id ON log (user_id, week, day, id)",
+        "CREATE INDEX IF NOT EXISTS ix_workout_session_user_week_day"
+        " ON workout_session (user_id, week, day, session_date)",
+        "CREATE INDEX IF NOT EXISTS ix_pr_history_user_date_id ON pr_history (user_id, session_date, id)",
+    ]:
+        conn.execute(text(ddl))
+
+def _m6_day_summary(conn):
+    # day_summary itself comes from create_all; fill it from the sessions
+    # already logged so the calendar keeps showing them
+    summaries.rebuild(conn)
+
+def _m7_estimated_rm(conn):
+    # estimated_rm came from create_all without a backfill; fill it from the
+    # existing log so the RM test page's progress table isn't empty
+    summaries.rebuild_estimated_rms(conn)
+
+def _m8_sqlite_session_ids(conn):
+    # workout_session.id was created as BIGINT, which SQLite never fills in
+    # (only an INTEGER primary key aliases the rowid), so new sessions failed
+    # with NOT NULL on databases created before the models used INTEGER there
+    if conn.dialect.name == "sqlite":
+        _sqlite_rewrite_table(conn, "workout_session", r"\bid BIGINT\b", "id INTEGER")
+
+# Each entry upgrades the schema by one version: MIGRATIONS[0] takes a
+# version-1 database (the original create_all layout) to version 2, and so on.
+# Migrations receive a Connection inside the bootstrap transaction.
+MIGRATIONS = [
+    _m2_state_data_version,
+    _m3_multi_user,
+    _m4_log_reps,
+    _m5_query_indexes,
+    _m6_day_summary,
+    _m7_estimated_rm,
+    _m8_sqlite_session_ids,
+]
+
+SCHEMA_VERSION = 1 + len(MIGRATIONS)
+
+_lock = threading.Lock()
+_ready_version = None
+_default_user_id = None
+
+# Number of full bootstrap checks run by this process (first request + /healthz)
+bootstrap_checks = 0
+
+def ready_version():
+    return _ready_version
+
+def default_user_id():
+    return _default_user_id
+
+def bootstrap(engine, force: bool = False) -> int:
+    """
+    Bring the database up to SCHEMA_VERSION and return it.
+    Returns immediately once this process has bootstrapped, unless force=True.
+    """
+    global _ready_version, _default_user_id, bootstrap_checks
+    if _ready_version is not None and not force:
+        return _ready_version
+
+    with _lock:
+        if _ready_version is not None and not force:
+            return _ready_version
+        bootstrap_checks += 1
+
+        with engine.begin() as conn:
+            conn.execute(text("select 1"))
+            # A database with tables but no version row predates versioning
+            legacy = inspect(conn).has_table("log")
+            Base.metadata.create_all(conn)
+
+            stored = conn.execute(
+                select(SchemaVersion).where(SchemaVersion.id == 1)
+            ).first()
+            if stored is not None:
+                current = stored.version
+            else:
+                current = 1 if legacy else SCHEMA_VERSION
+
+            for version, migrate in enumerate(MIGRATIONS, start=2):
+                if version > current:
+                    migrate(conn)
+
+            now = datetime.now(timezone.utc)
+            if stored is None:
+                conn.execute(SchemaVersion.__table__.insert().values(
+                    id=1, version=SCHEMA_VERSION, applied_at=now))
+            elif current < SCHEMA_VERSION:
+                conn.execute(SchemaVersion.__table__.update()
+                             .where(SchemaVersion.id == 1)
+                             .values(version=SCHEMA_VERSION, applied_at=now))
+
+            _default_user_id = _ensure_default_user(conn)
+
+        _ready_version = SCHEMA_VERSION
+        return _ready_version
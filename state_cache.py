@@ -0,0 +1,113 @@
+"""
+Per-worker cache of State rows.
+
+Nearly every route reads State (units, the four 1RMs, data_version) and
+the user's training blocks before doing anything else. current() serves a
+frozen snapshot of both from memory instead, so read-only page views skip
+those queries.
+
+Consistency across gunicorn workers comes from a small table of version
+tokens in anonymous shared memory, created at import. With preload_app
+(gunicorn.conf.py) the app is imported once in the master, so every forked
+worker maps the same table. Each snapshot remembers the token of its user's
+slot from just before it was loaded. Any commit that touches a State or
+TrainingBlock row writes a fresh token to that slot (see track()), so every worker sees the
+mismatch on its next lookup and reloads. Checking a token is a memory read,
+not a database round trip.
+
+The tokens only reach processes forked from one parent. Set STATE_CACHE=0
+when several instances share a database, or when workers import the app
+themselves.
+"""
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+import config
+from models import State, TrainingBlock
+
+_SLOTS = 4096          # users hash onto slots; a collision only costs an extra reload
+_TOKEN = 8             # bytes per slot
+_CACHE_SIZE = 1024     # snapshots kept per worker, least recently used evicted
+
+_shared = mmap.mmap(-1, _SLOTS * _TOKEN)  # MAP_SHARED | MAP_ANONYMOUS: survives fork
+_lock = threading.Lock()
+_cache = OrderedDict()  # user_id -> (token, StateSnapshot)
+
+@dataclass(frozen=True, slots=True)
+class StateSnapshot:
+    # Read-only copy of a State row; same attribute names, so it can stand in
+    # for the row wherever State is only read (charts, seeding, templates)
+    user_id: int
+    units: str
+    bench: float | None
+    squat: float | None
+    deadlift: float | None
+    ohp: float | None
+    data_version: int
+    blocks: tuple = ()  # blocks.BlockView, oldest first
+
+    @classmethod
+    def of(cls, st: State, blocks: tuple = ()) -> "StateSnapshot":
+        return cls(st.user_id, st.units or "kg", st.bench, st.squat, st.deadlift, st.ohp,
+                   st.data_version or 0, tuple(blocks))
+
+def _slot(user_id: int) -> slice:
+    i = (user_id % _SLOTS) * _TOKEN
+    return slice(i, i + _TOKEN)
+
+def _token(user_id: int) -> bytes:
+    return _shared[_slot(user_id)]
+
+def invalidate(user_id: int):
+    # Every worker's snapshot of this user goes stale; a random token can't
+    # collide with one a reader already holds, even when writers race
+    _shared[_slot(user_id)] = os.urandom(_TOKEN)
+    with _lock:
+        _cache.pop(user_id, None)
+
+def current(user_id: int, load) -> StateSnapshot:
+    """
+    Snapshot of user_id's State, from the cache while no commit has touched it
+    since; otherwise load() (returning a fresh StateSnapshot) is called and cached.
+    """
+    if not config.STATE_CACHE:
+        return load()
+
+    token = _token(user_id)  # read before loading, so a write in between forces a reload
+    with _lock:
+        hit = _cache.get(user_id)
+        if hit is not None and hit[0] == token:
+            _cache.move_to_end(user_id)
+            return hit[1]
+
+    snap = load()
+    with _lock:
+        _cache[user_id] = (token, snap)
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return snap
+
+def _before_flush(session, flush_context, instances):
+    touched = session.info.setdefault("state_cache_touched", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (State, TrainingBlock)) and obj.user_id is not None:
+            touched.add(obj.user_id)
+
+def _after_commit(session):
+    for user_id in session.info.pop("state_cache_touched", ()):
+        invalidate(user_id)
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop("state_cache_touched", None)
+
+def track(session_class):
+    # Invalidate after every commit that wrote a State or TrainingBlock row
+    # through an ORM session of session_class (bulk UPDATEs would bypass this)
+    event.listen(session_class, "before_flush", _before_flush)
+    event.listen(session_class, "after_commit", _after_commit)
+    event.listen(session_class, "after_soft_rollback", _after_rollback)
@@ -0,0 +1,142 @@
+"""
+Precomputed summary tables, kept current on save and backfilled by the
+schema migrations.
+
+Each DaySummary row covers one user and one date behind the history
+calendar. It holds the sessions logged that day, the sets with reps entered,
+the volume (load x reps over those sets, in kg) and the total duration.
+save_week_inputs() refreshes every date that has a session for the saved
+week/day. The calendar then reads a month with one indexed query, with no
+WorkoutSession grouping or Log join per visit.
+
+EstimatedRM holds the best Epley estimate per (user, lift, week) behind the
+RM test page's progress table; week saves maintain it incrementally
+(app.refresh_estimated_rms) and rebuild_estimated_rms() recomputes it all.
+
+Everything goes through .execute(), so the same code runs on an ORM
+Session (week saves) and on a bare Connection (the schema migrations that
+backfill existing databases).
+"""
+from itertools import groupby
+
+from sqlalchemy import delete, insert, select, tuple_, update
+
+from logic import ESTIMATED_RM_MAP, best_estimated_rms
+from models import DaySummary, EstimatedRM, Log, WorkoutSession
+
+_FIELDS = ("sessions", "week", "day", "total_sets", "volume_kg", "duration_seconds")
+
+def _totals(log_rows) -> tuple:
+    # (sets with reps entered, volume in kg) over (load_last, reps) pairs
+    sets, volume = 0, 0.0
+    for load, reps in log_rows:
+        for x in reps or ():
+            if x is None:
+                continue
+            sets += 1
+            if load:
+                volume += load * x
+    return sets, volume
+
+def refresh(conn, user_id: int, dates) -> int:
+    """
+    Recompute user_id's summaries for `dates` from their sessions, writing
+    only rows that differ; dates left without a session lose their row.
+    Returns the number of rows written.
+    """
+    dates = set(dates)
+    if not dates:
+        return 0
+
+    sessions = conn.execute(
+        select(WorkoutSession.session_date, WorkoutSession.week, WorkoutSession.day,
+               WorkoutSession.duration_seconds)
+        .where(WorkoutSession.user_id == user_id, WorkoutSession.session_date.in_(dates))
+        .order_by(WorkoutSession.session_date, WorkoutSession.id)
+    ).all()
+
+    logs = {}
+    keys = {(s.week, s.day) for s in sessions}
+    if keys:
+        for week, day, load, reps in conn.execute(
+            select(Log.week, Log.day, Log.load_last, Log.reps)
+            .where(Log.user_id == user_id, tuple_(Log.week, Log.day).in_(keys))
+        ):
+            logs.setdefault((week, day), []).append((load, reps))
+
+    computed = {}
+    for day_date, group in groupby(sessions, key=lambda s: s.session_date):
+        group = list(group)
+        sets, volume = 0, 0.0
+        for key in dict.fromkeys((s.week, s.day) for s in group):  # a day's rows count once
+            day_sets, day_volume = _totals(logs.get(key, ()))
+            sets += day_sets
+            volume += day_volume
+        durations = [s.duration_seconds for s in group if s.duration_seconds is not None]
+        computed[day_date] = dict(
+            sessions=len(group), week=group[0].week, day=group[0].day, total_sets=sets,
+            volume_kg=round(volume, 2), duration_seconds=sum(durations) if durations else None,
+        )
+
+    existing = {
+        r.session_date: r
+        for r in conn.execute(
+            select(DaySummary.id, DaySummary.session_date, *[getattr(DaySummary, f) for f in _FIELDS])
+            .where(DaySummary.user_id == user_id, DaySummary.session_date.in_(dates))
+        )
+    }
+    written = 0
+    for day_date in dates:
+        values, cur = computed.get(day_date), existing.get(day_date)
+        if values is None:
+            if cur is not None:
+                conn.execute(delete(DaySummary).where(DaySummary.id == cur.id))
+                written += 1
+        elif cur is None:
+            conn.execute(insert(DaySummary).values(user_id=user_id, session_date=day_date, **values))
+            written += 1
+        elif any(getattr(cur, f) != v for f, v in values.items()):
+            conn.execute(update(DaySummary).where(DaySummary.id == cur.id).values(**values))
+            written += 1
+    return written
+
+def refresh_week_day(conn, user_id: int, week: int, day: int) -> int:
+    # Every date with a session for (week, day): its rows feed all of them
+    dates = conn.execute(
+        select(WorkoutSession.session_date).distinct()
+        .where(WorkoutSession.user_id == user_id, WorkoutSession.week == week,
+               WorkoutSession.day == day)
+    ).scalars().all()
+    return refresh(conn, user_id, dates)
+
+def rebuild(conn) -> int:
+    # Summaries for every user's sessions (backfill); returns rows written
+    written = 0
+    pairs = conn.execute(
+        select(WorkoutSession.user_id, WorkoutSession.session_date).distinct()
+        .order_by(WorkoutSession.user_id)
+    ).all()
+    for user_id, group in groupby(pairs, key=lambda p: p.user_id):
+        written += refresh(conn, user_id, [p.session_date for p in group])
+    return written
+
+def rebuild_estimated_rms(conn) -> int:
+    # EstimatedRM for every user from the full Log history; returns rows written
+    rows = conn.execute(
+        select(Log.user_id, Log.exercise, Log.week, Log.load_last, Log.reps)
+        .where(Log.exercise.in_(list(ESTIMATED_RM_MAP.keys())))
+        .order_by(Log.user_id)
+        .execution_options(yield_per=1000)
+    )
+
+    conn.execute(delete(EstimatedRM))
+    written = 0
+    for user_id, user_rows in groupby(rows, key=lambda r: r.user_id):
+        best = best_estimated_rms(user_rows)
+        if best:
+            conn.execute(insert(EstimatedRM), [
+                {"user_id": user_id, "lift_key": key, "week": week, "est_kg": est}
+                for (key, week), est in best.items()
+            ])
+            written += len(best)
+    return written
@@ -0,0 +1,20 @@
+"""
+Shared fixtures. Every test gets the app bound to its own throwaway SQLite
+database (bench.fresh_app), so tests never touch local.db or each other's rows.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bench  # noqa: E402
+
+@pytest.fixture
+def app_module():
+    return bench.fresh_app()
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
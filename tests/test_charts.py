@@ -0,0 +1,35 @@
+"""
+Dashboard chart and series ETags change with the data and with the render
+configuration, not only with the data.
+"""
+from sqlalchemy.orm import Session
+
+import charts
+import config
+import schema
+
+def etags(app_module) -> set:
+    with Session(app_module.engine) as s:
+        st = app_module.current_state(s, schema.default_user_id())
+    return {charts.chart_etag(st, name) for name in ("series", "bodyweight")}
+
+def test_etag_tracks_render_configuration(app_module, monkeypatch):
+    base = etags(app_module)
+    assert len(base) == 2 and etags(app_module) == base
+
+    monkeypatch.setattr(charts, "CHART_VERSION", charts.CHART_VERSION + 1)
+    bumped = etags(app_module)
+    monkeypatch.undo()
+    monkeypatch.setattr(config, "HISTORY_WEEKS", config.HISTORY_WEEKS + 1)
+    window = etags(app_module)
+    monkeypatch.undo()
+    monkeypatch.setattr(charts, "DASHBOARD_LIFTS", charts.DASHBOARD_LIFTS[:-1])
+    lifts = etags(app_module)
+
+    assert not base & bumped and not base & window and not base & lifts
+
+def test_series_304_until_data_changes(client):
+    first = client.get("/api/dashboard/series")
+    assert first.status_code == 200 and first.headers["ETag"]
+    again = client.get("/api/dashboard/series", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
@@ -0,0 +1,41 @@
+"""
+Who the login form signs in as under each MULTI_USER / PASSWORD setting;
+a blank username never reaches the default user's data under MULTI_USER
+without a shared PASSWORD.
+"""
+import pytest
+from sqlalchemy.orm import Session
+from werkzeug.security import generate_password_hash
+
+from models import User
+
+CASES = [
+    # (MULTI_USER, PASSWORD, username, password, allowed)
+    ("", "", "", "anything", True),        # no login configured: default user
+    ("", "s3cret", "", "s3cret", True),
+    ("", "s3cret", "", "wrong", False),
+    ("1", "", "", "anything", False),      # MULTI_USER without PASSWORD: no default user
+    ("1", "", "", "", False),
+    ("1", "s3cret", "", "s3cret", True),
+    ("1", "s3cret", "", "wrong", False),
+    ("1", "", "alice", "pw", True),
+    ("1", "", "alice", "nope", False),
+    ("1", "", "nobody", "pw", False),
+]
+
+@pytest.mark.parametrize("multi,pw,username,password,allowed", CASES)
+def test_login(app_module, client, monkeypatch, multi, pw, username, password, allowed):
+    with Session(app_module.engine) as s:
+        s.add(User(username="alice", password_hash=generate_password_hash("pw")))
+        s.commit()
+    monkeypatch.setenv("MULTI_USER", multi)
+    monkeypatch.setenv("PASSWORD", pw)
+
+    client.post("/login", data={"username": username, "password": password})
+    with client.session_transaction() as sess:
+        uid = sess.get("user_id")
+    page = client.get("/week/1").status_code
+    if allowed:
+        assert uid is not None and page == 200
+    else:
+        assert uid is None and page == 302
@@ -0,0 +1,41 @@
+"""
+logic.compute_new_loads and epley_best (columns at once) match their scalar
+functions row for row, over seeded random rows covering the edge cases.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from bench import random_progression_rows
+from logic import (amrap_reps, compute_new_load, compute_new_loads, epley_1rm, epley_best,
+                   reps_matrix)
+
+COLUMNS = ["load_last", "rep_high", "increment", "category", "sets", "reps"]
+
+def scalar(rows) -> list:
+    return [compute_new_load(dict(r, amrap=amrap_reps(r["reps"], r["sets"])
+                                  if r["category"] == "accessory" else None)) for r in rows]
+
+def columns(rows) -> list:
+    return [[r[k] for r in rows] for k in COLUMNS]
+
+@pytest.mark.parametrize("seed", range(200))
+def test_batch_matches_scalar(seed):
+    rows = random_progression_rows(200, seed)
+    got = [None if math.isnan(x) else x for x in compute_new_loads(*columns(rows)).tolist()]
+    for row, want, g in zip(rows, scalar(rows), got):
+        assert g == want, row
+
+def test_packed_arrays_match_lists():
+    cols = columns(random_progression_rows(5000, seed=1000))
+    packed = [np.array([np.nan if x in (None, "") else x for x in cols[0]], dtype=np.float64),
+              np.array(cols[1]), np.array([x or 0.0 for x in cols[2]]), np.array(cols[3]),
+              np.array(cols[4]), reps_matrix(cols[5], width=max(cols[4]))]
+    assert np.array_equal(compute_new_loads(*packed), compute_new_loads(*cols), equal_nan=True)
+
+def test_epley_best_matches_scalar():
+    rows = random_progression_rows(2000, seed=2000)
+    loads, reps = [r["load_last"] for r in rows], [r["reps"] for r in rows]
+    want = [epley_1rm(w, max((x or 0 for x in rs or []), default=0)) for w, rs in zip(loads, reps)]
+    assert epley_best(loads, reps).tolist() == want
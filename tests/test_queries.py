@@ -0,0 +1,58 @@
+"""
+Week pages run a fixed, small number of statements however big the program
+is: init_week_rows() loads a week in one query and writes in batches.
+"""
+import pytest
+from sqlalchemy import event
+
+import config
+import logic
+
+# State and the training blocks come from the per-worker cache unless it's off
+WARM_WEEK_LIMIT = 3 if config.STATE_CACHE else 7
+RM_FORM = {"bench_rm": "100", "squat_rm": "140", "deadlift_rm": "180", "ohp_rm": "60"}
+
+@pytest.fixture
+def grow_program(app_module):
+    # grow_program(extra): every program day gets `extra` more exercises, in
+    # place (app imported the same DAYS list); restored after the test
+    program = [list(exercises) for _, exercises in logic.DAYS]
+
+    def grow(extra: int):
+        for (_, exercises), base in zip(logic.DAYS, program):
+            exercises[:] = base + [(f"Extra {n}", 3, 8, 12, "accessory", 1.25) for n in range(extra)]
+        app_module.PROGRAM_HASH = logic.program_fingerprint()
+
+    yield grow
+    grow(0)
+
+def test_week_statements_do_not_grow_with_the_program(app_module, client, grow_program):
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)  # an executemany INSERT is one round trip
+
+    def measure(method, url, data=None) -> int:
+        statements.clear()
+        resp = client.post(url, data=data) if method == "POST" else client.get(url)
+        assert resp.status_code in (200, 302), (url, resp.status_code)
+        return len(statements)
+
+    client.get("/week/1")  # creates the State row and block 1
+    results = {}
+    event.listen(app_module.engine, "before_cursor_execute", count)
+    try:
+        for i, extra in enumerate([0, 10, 50]):
+            grow_program(extra)
+            week = 3 + i  # past the RM-seeded weeks 1/2: not materialized yet
+            measure("POST", "/rm-test", RM_FORM)  # syncs weeks 1/2 to this program
+            results[extra] = {
+                "cold GET /week/<n>": measure("GET", f"/week/{week}"),
+                "warm GET /week/<n>": measure("GET", f"/week/{week}"),
+                "POST /rm-test": measure("POST", "/rm-test", RM_FORM),
+            }
+    finally:
+        event.remove(app_module.engine, "before_cursor_execute", count)
+
+    for name in results[0]:
+        assert len({counts[name] for counts in results.values()}) == 1, (name, results)
+    assert results[0]["warm GET /week/<n>"] <= WARM_WEEK_LIMIT, results
@@ -0,0 +1,74 @@
+"""
+The week, history, dashboard and rm-test queries use index scans.
+
+Runs on a throwaway SQLite database; set EXPLAIN_DATABASE_URL to an empty
+scratch Postgres database to check its plans instead (seeded by the test).
+"""
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+import bench
+
+TODAY = date.today()
+ROUTES = [
+    ("POST", "/api/week/2/day/1"),
+    ("GET", "/week/2"),
+    ("GET", f"/history?y={TODAY.year}&m={TODAY.month}"),
+    ("GET", f"/history/{TODAY.year}/{TODAY.month}/{TODAY.day}"),
+    ("GET", "/dashboard"),
+    ("GET", "/api/dashboard/series"),
+    ("GET", "/rm-test"),
+]
+
+def _plan(conn, statement: str, parameters) -> tuple:
+    # Plan lines for one captured statement, plus the offending ones: full table
+    # scans, and on SQLite also sorts the index order didn't cover
+    if conn.dialect.name == "sqlite":
+        lines = [r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+        # (SCAN CONSTANT ROW walks a literal VALUES list, e.g. a row-value IN)
+        bad = [ln for ln in lines if (ln.startswith("SCAN ") and " USING " not in ln
+                                      and ln != "SCAN CONSTANT ROW")
+               or ln.startswith("USE TEMP B-TREE")]
+    else:
+        # tiny test tables would always get a seq scan; ask for the best index plan
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        lines = [r[0] for r in conn.exec_driver_sql("EXPLAIN " + statement, parameters)]
+        bad = [ln.strip() for ln in lines if "Seq Scan" in ln]
+    return lines, bad
+
+@pytest.fixture
+def seeded_app():
+    app = bench.fresh_app(os.environ.get("EXPLAIN_DATABASE_URL"))
+    bench.seed_log(app.engine, 12)
+    client = app.app.test_client()
+    client.get("/week/2")  # first visit creates the State row and syncs the week
+    # the day save records today's WorkoutSession, which the history pages then read
+    assert client.post("/api/week/2/day/1", json={}).status_code == 200
+    return app, client
+
+@pytest.mark.parametrize("method,url", ROUTES)
+def test_route_queries_use_indexes(seeded_app, method, url):
+    app, client = seeded_app
+    captured = []
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM" in statement.upper():
+            captured.append((statement, tuple(parameters) if isinstance(parameters, list) else parameters))
+
+    event.listen(app.engine, "before_cursor_execute", capture)
+    try:
+        resp = client.post(url, json={}) if method == "POST" else client.get(url)
+    finally:
+        event.remove(app.engine, "before_cursor_execute", capture)
+    assert resp.status_code == 200, resp.status_code
+    assert captured
+
+    failures = []
+    with app.engine.connect() as conn:
+        for statement, parameters in dict.fromkeys(captured):
+            lines, bad = _plan(conn, statement, parameters)
+            if bad:
+                failures.append(" ".join(statement.split()) + "\n    " + "\n    ".join(lines))
+    assert not failures, "full table scan or unindexed sort:\n" + "\n".join(failures)
@@ -0,0 +1,24 @@
+"""
+Migrations bring databases created by older versions up to the current schema.
+"""
+from sqlalchemy import text
+
+import bench
+import schema
+
+def test_sqlite_session_ids_rebuilt_as_integer():
+    # a database created while WorkoutSession.id was plain BIGINT, one version back
+    app = bench.fresh_app()
+    with app.engine.begin() as conn:
+        schema._sqlite_rewrite_table(conn, "workout_session", r"\bid INTEGER\b", "id BIGINT")
+        conn.execute(text("UPDATE schema_version SET version = :v"), {"v": schema.SCHEMA_VERSION - 1})
+    app.ensure_db(force=True)
+
+    client = app.app.test_client()
+    client.get("/week/1")
+    for _ in range(2):  # the second save reuses the day's session row
+        assert client.post("/api/week/1/day/1", json={}).status_code == 200
+    with app.engine.connect() as conn:
+        ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'workout_session'")).scalar()
+        assert "id INTEGER" in ddl
+        assert conn.execute(text("SELECT id FROM workout_session")).scalars().all() == [1]
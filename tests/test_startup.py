@@ -0,0 +1,17 @@
+"""
+A cold worker imports the app without numpy, matplotlib or openpyxl; they
+load on first use (batch progression, /dashboard, /export.xlsx).
+"""
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_import_app_skips_heavy_deps():
+    probe = ("import json, sys; sys.path.insert(0, %r); import app; "
+             "print(json.dumps([m for m in ('numpy', 'matplotlib', 'openpyxl') if m in sys.modules]))" % HERE)
+    env = dict(os.environ, DATABASE_URL="sqlite://")
+    out = subprocess.run([sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True)
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == []
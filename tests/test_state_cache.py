@@ -0,0 +1,45 @@
+"""
+Commits that touch State invalidate the cached snapshot; a rollback drops
+the pending invalidations and lets the original error through.
+"""
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import schema
+from models import State
+
+def _other(units: str) -> str:
+    return "lb" if units == "kg" else "kg"
+
+def test_commit_invalidates_snapshot(app_module):
+    uid = schema.default_user_id()
+    with Session(app_module.engine) as s:
+        st = app_module.get_or_create_state(s, uid)
+        before = app_module.current_state(s, uid).units
+        st.units = _other(before)
+        s.commit()
+        assert app_module.current_state(s, uid).units == _other(before)
+
+def test_failed_flush_raises_integrity_error(app_module):
+    uid = schema.default_user_id()
+    with Session(app_module.engine) as s:
+        app_module.current_state(s, uid)
+        s.add(State(user_id=uid))  # uq_state_user: one State per user
+        with pytest.raises(IntegrityError):
+            s.commit()
+        s.rollback()
+        assert "state_cache_touched" not in s.info
+        assert app_module.current_state(s, uid).user_id == uid
+
+def test_rollback_clears_pending_invalidations(app_module):
+    uid = schema.default_user_id()
+    with Session(app_module.engine) as s:
+        st = app_module.get_or_create_state(s, uid)
+        before = app_module.current_state(s, uid).units
+        st.units = _other(before)
+        s.flush()
+        assert s.info["state_cache_touched"] == {uid}
+        s.rollback()
+        assert "state_cache_touched" not in s.info
+        assert app_module.current_state(s, uid).units == before
@@ -0,0 +1,30 @@
+"""
+/api/sync: offline batches replayed by week.html.
+"""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import logic
+from models import Log
+
+def entry(**kw):
+    day, exercises = logic.DAYS[0]
+    return dict({"week": 1, "day": 1, "exercise": exercises[0][0]}, **kw)
+
+def test_sync_applies_reps(app_module, client):
+    client.get("/week/1")
+    e = entry(load=60, reps=[8, None, 7])
+    resp = client.post("/api/sync", json={"entries": [e]})
+    assert resp.status_code == 200, resp.get_json()
+    assert resp.get_json()["unknown"] == []
+    with Session(app_module.engine) as s:
+        reps = s.scalars(select(Log.reps).where(Log.week == 1, Log.day == 1,
+                                                Log.exercise == e["exercise"])).one()
+    assert reps == [8, None, 7]
+
+@pytest.mark.parametrize("reps", [5, "888", [8, "8"], [8, 8.5], [True], {"1": 8}])
+def test_sync_rejects_malformed_reps(client, reps):
+    client.get("/week/1")
+    resp = client.post("/api/sync", json={"entries": [entry(reps=reps)]})
+    assert resp.status_code == 400
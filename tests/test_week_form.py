@@ -0,0 +1,23 @@
+"""
+Parsing of the week form's per-row inputs (row_<id>_load, row_<id>_s<N>).
+"""
+from types import SimpleNamespace
+
+def row(sets=3, reps=None):
+    return SimpleNamespace(sets=sets, reps=reps, load_last=None)
+
+def test_set_inputs_fill_reps_in_order(app_module):
+    r = row()
+    assert app_module.apply_row_fields(r, {"s1": "5", "s3": "4"}, "kg")
+    assert r.reps == [5, None, 4]
+
+def test_extra_sets_up_to_the_cap(app_module):
+    r = row()
+    app_module.apply_row_fields(r, {f"s{app_module.MAX_SETS}": "6"}, "kg")
+    assert len(r.reps) == app_module.MAX_SETS
+
+def test_set_index_past_the_cap_is_ignored(app_module):
+    r = row(reps=[5, 5, 5])
+    for key in (f"s{app_module.MAX_SETS + 1}", "s200000", "s0"):
+        assert not app_module.apply_row_fields(r, {key: "5"}, "kg")
+    assert r.reps == [5, 5, 5]
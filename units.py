@@ -0,0 +1,62 @@
+"""
+Display units.
+
+Weights are stored in kg. Pages and JSON show them in the user's units
+(State.units, "kg" or "lb"). Conversion happens here, once per result set,
+into read-only views. Display values are never written back onto ORM rows,
+because the session would flush them as UPDATEs.
+"""
+from dataclasses import dataclass
+
+LB_PER_KG = 2.20462262185
+
+def factor(units: str) -> float:
+    # kg -> display units multiplier
+    return LB_PER_KG if units == "lb" else 1.0
+
+def to_kg(x: float | None, units: str) -> float | None:
+    # A weight entered in display units, as stored
+    if x is None:
+        return None
+    return x / LB_PER_KG if units == "lb" else x
+
+def display(x_kg: float | None, units: str, ndigits: int = 2) -> float | None:
+    if x_kg is None:
+        return None
+    return round(x_kg * factor(units), ndigits)
+
+def display_many(values_kg, units: str, ndigits: int = 2) -> list:
+    # display() over a whole column; None stays None
+    f = factor(units)
+    return [None if x is None else round(x * f, ndigits) for x in values_kg]
+
+@dataclass(frozen=True, slots=True)
+class LogView:
+    # One Log row as the week and history pages show it: loads in display units
+    id: int
+    week: int
+    day: int
+    day_title: str
+    exercise: str
+    sets: int
+    rep_low: int
+    rep_high: int
+    category: str
+    load_last: float | None
+    reps: list | None
+    amrap: int | None
+    new_load: float | None
+    notes: str | None
+
+def log_views(rows, units: str, ndigits: int = 2) -> list:
+    """LogViews for Log rows (entities or rows with the same named columns)."""
+    f = factor(units)
+    return [
+        LogView(r.id, r.week, r.day, r.day_title, r.exercise, r.sets, r.rep_low, r.rep_high,
+                r.category,
+                None if r.load_last is None else round(r.load_last * f, ndigits),
+                r.reps, r.amrap,
+                None if r.new_load is None else round(r.new_load * f, ndigits),
+                r.notes)
+        for r in rows
+    ]